@@ -0,0 +1,135 @@
+import random
+from exhaustive import FREQUENCIES
+from handstate import HandState
+from preflop import handClass, vsRandom
+
+##
+# AI opponent
+#  Decides check, raise or fold from table lookups only, so a decision costs
+#  the same few operations on every street:
+#   - made hands: the percentile of the hand among every hand of its size,
+#     read from the exact category frequencies and refined by the top rank
+#   - draws: flush and straight draws from the suit and rank masks
+#   - hole cards: the preflop equity of their class against a random hand
+#  The preflop table is loaded (or generated once and saved) when the player
+#  is created, never during play.  The engine passes the seat's incremental
+#  hand states (see handstate.py), so the masks are not rebuilt per decision.
+
+CHECK = "check"  # also calls a bet
+RAISE = "raise"
+FOLD = "fold"
+CALL = "call"  # a check answering a raise, as PokerEngine.AIAction reports it
+
+RAISE_AT = 0.75  # strength needed to raise
+CALL_MARGIN = 0.05  # strength needed over the pot odds to call
+BLUFF = 0.05  # chance of raising with any hand
+JITTER = 0.05  # random change of the strength, so play is not predictable
+
+FLUSH_DRAW = 0.12  # strength added by four to a flush with one card to come
+STRAIGHT_DRAW = 0.08  # strength added by an open-ended straight draw with one card to come
+PREFLOP_WEIGHT = 0.25  # share of the hole card equity in the strength
+
+
+def _percentiles(counts):
+    """
+    Get the share of hands below every category and the share of the category itself
+
+    :param counts: list of 11 hand counts indexed by category
+    :return: list of (below, share) indexed by category
+    """
+
+    total = sum(counts)
+    below = 0
+    table = []
+    for count in counts:
+        table.append((below / total, count / total))
+        below += count
+    return table
+
+
+_PERCENTILES = {size: _percentiles(counts) for size, counts in FREQUENCIES.items()}
+
+
+##
+# AIPlayer class
+#  the AI seat's decisions
+class AIPlayer:
+    def __init__(self, seed=None):
+        """
+        Set up the AI and load its tables
+
+        :param seed: random seed (None for an unpredictable player)
+        """
+
+        self._random = random.Random(seed)
+        self._preflop = vsRandom()
+        low = min(self._preflop)
+        self._preflopRange = (low, max(self._preflop) - low)
+
+    def strength(self, hole, board, state=None, boardState=None):
+        """
+        Rate hole cards on a board
+
+        :param hole: the AI's two hole card codes
+        :param board: 3 ~ 5 community card codes
+        :param state: HandState of the hole cards and the board (built when None)
+        :param boardState: HandState of the board (built when None)
+        :return: float - 0 (worst) ~ 1 (best)
+        """
+
+        if boardState is None:
+            boardState = HandState(board)
+        if state is None:
+            state = boardState.copy()
+            for code in hole:
+                state.add(code)
+        key = state.strength()
+        category = key >> 20
+
+        # Made hand: percentile among every hand with this many cards
+        below, share = _PERCENTILES[state.size()][category]
+        made = below + share * (key >> 16 & 15) / 12
+        if boardState.category() >= category:
+            # The hole cards only add kickers to the board's hand
+            made *= 0.5
+
+        # Draws are worth more the more cards are to come
+        toCome = 5 - boardState.size()
+        if toCome:
+            if state.flushDraw():
+                made += FLUSH_DRAW * toCome
+            outs = state.straightOuts()
+            if outs >= 2:
+                made += STRAIGHT_DRAW * toCome
+            elif outs == 1:
+                made += STRAIGHT_DRAW * toCome / 2
+
+        low, spread = self._preflopRange
+        preflop = (self._preflop[handClass(*hole)] - low) / spread
+        return min(1.0, (1 - PREFLOP_WEIGHT) * made + PREFLOP_WEIGHT * preflop)
+
+    def decide(self, hole, board, pot, toCall=0, bank=0, canRaise=True, state=None, boardState=None):
+        """
+        Choose an action
+
+        :param hole: the AI's two hole card codes
+        :param board: community card codes
+        :param pot: chips in the pot, including any bet to call
+        :param toCall: chips the AI must put in to stay in the round
+        :param bank: most chips the opponent can still call
+        :param canRaise: False if the AI may only check, call or fold
+        :param state: HandState of the hole cards and the board, if the caller keeps one
+        :param boardState: HandState of the board, if the caller keeps one
+        :return: (CHECK, 0), (RAISE, amount) or (FOLD, 0)
+        """
+
+        strength = self.strength(hole, board, state, boardState) + self._random.uniform(-JITTER, JITTER)
+
+        if toCall and strength < toCall / (pot + toCall) + CALL_MARGIN:
+            return FOLD, 0
+
+        if canRaise and bank > 0 and (strength > RAISE_AT or self._random.random() < BLUFF):
+            # Half the pot, the whole pot with the best hands
+            amount = pot if strength > (1 + RAISE_AT) / 2 else pot // 2
+            return RAISE, max(1, min(bank, amount))
+        return CHECK, 0
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+from evaluator import rankOf, _BITS, _STRAIGHT, _TOP, HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, \
+    FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH
+
+##
+# NumPy batch evaluator
+#  Evaluates an (N, cards) array of card codes at once and returns the same
+#  strength keys as evaluator.evaluate.  Rows are processed in chunks, so the
+#  input and output may be memory-mapped arrays larger than RAM.
+
+CHUNK_SIZE = 1 << 18
+
+
+def _pack(n):
+    """
+    Build a table of the top n ranks of every mask packed as 4-bit digits
+
+    :param n: number of ranks
+    :return: numpy array indexed by 13-bit rank mask
+    """
+
+    table = np.zeros(8192, np.uint32)
+    for mask in range(8192):
+        key = 0
+        top = _TOP[mask]
+        for i in range(n):
+            key = key << 4 | (top[i] if i < len(top) else 0)
+        table[mask] = key
+    return table
+
+
+def _highBits(n):
+    """
+    Build a table of the mask of the top n ranks of every mask
+
+    :param n: number of ranks
+    :return: numpy array indexed by 13-bit rank mask
+    """
+
+    table = np.zeros(8192, np.int32)
+    for mask in range(8192):
+        for rank in _TOP[mask][:n]:
+            table[mask] |= 1 << rank
+    return table
+
+
+# Per-code and per-mask lookups
+_RANK_BIT = np.array([1 << rankOf(code) for code in range(52)], np.int32)
+_SUIT = np.array([code // 13 for code in range(52)], np.int32)
+_COUNT = np.array(_BITS, np.int32)
+_STRAIGHT_HIGH = np.array(_STRAIGHT, np.uint32)
+_PACK1 = _pack(1)
+_PACK2 = _pack(2)
+_PACK3 = _pack(3)
+_PACK5 = _pack(5)
+_HIGH1 = _highBits(1)
+_HIGH2 = _highBits(2)
+
+
+def _evaluateChunk(codes):
+    """
+    Evaluate one chunk of hands
+
+    :param codes: (n, cards) integer array of card codes
+    :return: (n,) uint32 array of strength keys
+    """
+
+    codes = np.asarray(codes, np.intp)
+    bits = _RANK_BIT[codes]
+    suits = _SUIT[codes]
+
+    # Rank masks by multiplicity, one card column at a time
+    m1 = np.zeros(len(codes), np.int32)
+    m2 = np.zeros_like(m1)
+    m3 = np.zeros_like(m1)
+    m4 = np.zeros_like(m1)
+    for col in range(codes.shape[1]):
+        bit = bits[:, col]
+        m4 |= m3 & bit
+        m3 |= m2 & bit
+        m2 |= m1 & bit
+        m1 |= bit
+
+    # Rank mask of the flush suit (0 without a flush)
+    flushMask = np.zeros_like(m1)
+    for suit in range(4):
+        mask = np.bitwise_or.reduce(np.where(suits == suit, bits, 0), axis=1).astype(np.int32)
+        flushMask = np.where(_COUNT[mask] >= 5, mask, flushMask)
+
+    flushHigh = _STRAIGHT_HIGH[flushMask]
+    high = _STRAIGHT_HIGH[m1]
+    quadBit = _HIGH1[m4]
+    tripsBit = _HIGH1[m3]
+    fullPair = m2 & ~tripsBit
+    pairBits = _HIGH2[m2]
+
+    conditions = [
+        flushHigh == 13,
+        flushHigh > 0,
+        m4 != 0,
+        (m3 != 0) & (fullPair != 0),
+        flushMask != 0,
+        high > 0,
+        m3 != 0,
+        _COUNT[m2] >= 2,
+        m2 != 0,
+    ]
+    keys = [
+        np.uint32(ROYAL_FLUSH << 20 | 12 << 16),
+        STRAIGHT_FLUSH << 20 | (flushHigh - 1) << 16,
+        FOUR_OF_A_KIND << 20 | _PACK1[m4] << 16 | _PACK1[m1 & ~quadBit] << 12,
+        FULL_HOUSE << 20 | _PACK1[m3] << 16 | _PACK1[fullPair] << 12,
+        FLUSH << 20 | _PACK5[flushMask],
+        STRAIGHT << 20 | (high - 1) << 16,
+        THREE_OF_A_KIND << 20 | _PACK1[m3] << 16 | _PACK2[m1 & ~tripsBit] << 8,
+        TWO_PAIR << 20 | _PACK2[m2] << 12 | _PACK1[m1 & ~pairBits] << 8,
+        ONE_PAIR << 20 | _PACK1[m2] << 16 | _PACK3[m1 & ~_HIGH1[m2]] << 4,
+    ]
+    return np.select(conditions, keys, HIGH_CARD << 20 | _PACK5[m1]).astype(np.uint32)
+
+
+def evaluateBatch(codes, out=None, chunkSize=CHUNK_SIZE):
+    """
+    Evaluate many hands at once
+
+    :param codes: (N, cards) array of card codes, may be a numpy memmap
+    :param out: optional (N,) uint32 array (or memmap) to write keys into
+    :param chunkSize: number of hands evaluated per step
+    :return: (N,) uint32 array of strength keys, bigger is better
+    """
+
+    codes = np.asarray(codes)
+    if out is None:
+        out = np.empty(len(codes), np.uint32)
+
+    for start in range(0, len(codes), chunkSize):
+        stop = start + chunkSize
+        out[start:stop] = _evaluateChunk(codes[start:stop])
+    return out
+
+
+def evaluateFile(path, outPath, cards=7, chunkSize=CHUNK_SIZE):
+    """
+    Evaluate a raw file of uint8 card codes into a raw file of uint32 keys
+
+    :param path: input file, cards bytes per hand
+    :param outPath: output file, created or overwritten
+    :param cards: number of cards per hand
+    :param chunkSize: number of hands evaluated per step
+    :return: int - number of hands evaluated
+    """
+
+    # numpy cannot map an empty file: no hands, an empty output
+    if os.path.getsize(path) == 0:
+        open(outPath, "wb").close()
+        return 0
+
+    codes = np.memmap(path, np.uint8, "r").reshape(-1, cards)
+    out = np.memmap(outPath, np.uint32, "w+", shape=(len(codes),))
+    evaluateBatch(codes, out, chunkSize)
+    out.flush()
+    return len(codes)
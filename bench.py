@@ -0,0 +1,419 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import evaluator
+import hands
+from core import CARDS, CoreDeck, SlotDeck
+from evaluator import category, evaluate
+
+##
+# Benchmark suite
+#  Times the hand evaluators, the rank cascade helpers and deck operations on
+#  fixed-seed corpora and writes the results as JSON.  Compare two runs with
+#  --compare to catch regressions.
+#
+#  python bench.py --out bench.json
+#  python bench.py --quick --compare bench.json
+
+SEED = 2024
+CORPUS_SIZE = 2000
+REPEAT = 5
+
+
+def _card(rank, suit):
+    """
+    Get the card code of an ace-high rank and a suit index
+
+    :param rank: 0 (deuce) ~ 12 (ace)
+    :param suit: 0 ~ 3
+    :return: int - card code
+    """
+
+    return suit * 13 + (rank + 1) % 13
+
+
+def _core(cat, rng):
+    """
+    Get the cards every hand of a category is built around
+
+    :param cat: hand category (1 ~ 10)
+    :param rng: random.Random
+    :return: list of card codes
+    """
+
+    suit = rng.randrange(4)
+    ranks = rng.sample(range(13), 5)
+    if cat == evaluator.ROYAL_FLUSH:
+        return [_card(rank, suit) for rank in range(8, 13)]
+    elif cat == evaluator.STRAIGHT_FLUSH:
+        high = rng.randrange(3, 12)
+        return [_card((rank + 13) % 13, suit) for rank in range(high - 4, high + 1)]
+    elif cat == evaluator.FOUR_OF_A_KIND:
+        return [_card(ranks[0], s) for s in range(4)]
+    elif cat == evaluator.FULL_HOUSE:
+        return ([_card(ranks[0], s) for s in rng.sample(range(4), 3)] +
+                [_card(ranks[1], s) for s in rng.sample(range(4), 2)])
+    elif cat == evaluator.FLUSH:
+        return [_card(rank, suit) for rank in ranks]
+    elif cat == evaluator.STRAIGHT:
+        high = rng.randrange(3, 13)
+        return [_card((rank + 13) % 13, rng.randrange(4)) for rank in range(high - 4, high + 1)]
+    elif cat == evaluator.THREE_OF_A_KIND:
+        return [_card(ranks[0], s) for s in rng.sample(range(4), 3)]
+    elif cat == evaluator.TWO_PAIR:
+        return ([_card(ranks[0], s) for s in rng.sample(range(4), 2)] +
+                [_card(ranks[1], s) for s in rng.sample(range(4), 2)])
+    elif cat == evaluator.ONE_PAIR:
+        return [_card(ranks[0], s) for s in rng.sample(range(4), 2)]
+    return []
+
+
+def categoryCorpus(cat, size, count=CORPUS_SIZE, seed=SEED):
+    """
+    Build random hands that all fall in one category
+
+    :param cat: hand category (1 ~ 10)
+    :param size: cards per hand (5 ~ 7)
+    :param count: number of hands
+    :param seed: random seed
+    :return: list of card code lists
+    """
+
+    rng = random.Random(str(seed) + ":category:" + str(cat) + ":" + str(size))
+    corpus = []
+    while len(corpus) < count:
+        cards = _core(cat, rng)
+        rest = [code for code in range(52) if code not in cards]
+        cards = cards + rng.sample(rest, size - len(cards))
+        # Keep only hands the extra cards did not promote
+        if category(evaluate(cards)) == cat:
+            rng.shuffle(cards)
+            corpus.append(cards)
+    return corpus
+
+
+def randomCorpus(size, count=CORPUS_SIZE, seed=SEED):
+    """
+    Build random hands
+
+    :param size: cards per hand
+    :param count: number of hands
+    :param seed: random seed
+    :return: list of card code lists
+    """
+
+    rng = random.Random(str(seed) + ":random:" + str(size))
+    return [rng.sample(range(52), size) for i in range(count)]
+
+
+def worstCorpus(name, count=CORPUS_SIZE, seed=SEED):
+    """
+    Build 7-card hands that make the cascade helpers scan the longest
+
+    :param name: "straight" (broken runs, no straight) or
+                 "fullHouse" (three of a kind without a pair)
+    :param count: number of hands
+    :param seed: random seed
+    :return: list of card code lists
+    """
+
+    rng = random.Random(str(seed) + ":worst:" + name)
+    corpus = []
+    while len(corpus) < count:
+        if name == "straight":
+            # Two runs of four split by one missing rank, top-down
+            gap = rng.randrange(4, 9)
+            ranks = [rank for rank in range(gap - 4, gap + 4) if rank != gap][-7:]
+            cards = [_card(rank % 13, rng.randrange(4)) for rank in ranks]
+        else:
+            ranks = rng.sample(range(13), 5)
+            cards = [_card(ranks[0], s) for s in rng.sample(range(4), 3)]
+            cards += [_card(rank, rng.randrange(4)) for rank in ranks[1:]]
+        if len(set(cards)) == 7 and category(evaluate(cards)) < evaluator.STRAIGHT:
+            corpus.append(cards)
+    return corpus
+
+
+def timeIt(function, items, repeat=REPEAT):
+    """
+    Time a function over every item of a corpus
+
+    :param function: function of one item
+    :param items: list of items
+    :param repeat: number of runs, the best one is kept
+    :return: dictionary with ns per call and calls per second
+    """
+
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        for item in items:
+            function(item)
+        elapsed = time.perf_counter_ns() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    perCall = best / max(len(items), 1)
+    return {"calls": len(items), "nsPerCall": round(perCall, 1),
+            "callsPerSecond": round(1e9 / perCall) if perCall else 0}
+
+
+def timeStep(setup, function, items, repeat=REPEAT):
+    """
+    Time a function over every item of a corpus, after an untimed setup step per item
+
+    :param setup: function of one item, returning the argument of function
+    :param function: function of the setup's result
+    :param items: list of items
+    :param repeat: number of runs, the best one is kept
+    :return: dictionary with ns per call and calls per second
+    """
+
+    best = None
+    for i in range(repeat):
+        elapsed = 0
+        for item in items:
+            argument = setup(item)
+            start = time.perf_counter_ns()
+            function(argument)
+            elapsed += time.perf_counter_ns() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    perCall = best / max(len(items), 1)
+    return {"calls": len(items), "nsPerCall": round(perCall, 1),
+            "callsPerSecond": round(1e9 / perCall) if perCall else 0}
+
+
+def timeBatch(function, array, repeat=REPEAT):
+    """
+    Time a function called once on a whole array
+
+    :param function: function of the array
+    :param array: array of hands
+    :param repeat: number of runs, the best one is kept
+    :return: dictionary with ns per hand and hands per second
+    """
+
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        function(array)
+        elapsed = time.perf_counter_ns() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    perCall = best / max(len(array), 1)
+    return {"calls": len(array), "nsPerCall": round(perCall, 1),
+            "callsPerSecond": round(1e9 / perCall) if perCall else 0}
+
+
+def benchEvaluators(count, repeat):
+    """
+    Time checkHand, the cascade helpers and every evaluator backend
+
+    :param count: hands per corpus
+    :param repeat: runs per measurement
+    :return: dictionary of benchmark name to timing
+    """
+
+    results = {}
+    corpora = {}
+    for cat in range(1, 11):
+        corpora["category" + str(cat)] = categoryCorpus(cat, 7, count)
+    for size in (5, 6, 7):
+        corpora["random" + str(size)] = randomCorpus(size, count)
+    corpora["worstStraight"] = worstCorpus("straight", count)
+    corpora["worstFullHouse"] = worstCorpus("fullHouse", count)
+
+    helpers = {
+        "findHighest": hands.findHighest,
+        "findRepeat4": lambda cards: hands.findRepeat(4, cards),
+        "fullHouse": hands.fullHouse,
+        "flush": hands.flush,
+        "straight": hands.straight,
+        "twoPair": hands.twoPair,
+        "straightFlush": hands.straightFlush,
+        "royalFlush": hands.royalFlush,
+    }
+
+    backends = [("bitmask", evaluate)]
+    try:
+        import lookup
+        backends.append(("table", lookup.load().evaluate))
+    except (OSError, ValueError) as error:
+        print("skipping lookup table:", error, file=sys.stderr)
+    try:
+        import numpy as np
+        import batch
+    except ImportError:
+        np = None
+
+    for name, corpus in corpora.items():
+        cards = [[CARDS[code] for code in hand] for hand in corpus]
+        results["checkHand/" + name] = timeIt(hands.checkHand, cards, repeat)
+        results["cascadeHand/" + name] = timeIt(hands.cascadeHand, cards, repeat)
+        for backend, function in backends:
+            results[backend + "/" + name] = timeIt(function, corpus, repeat)
+        if np is not None and len(set(map(len, corpus))) == 1:
+            array = np.array(corpus, np.uint8)
+            results["batch/" + name] = timeBatch(batch.evaluateBatch, array, repeat)
+
+    # Every helper on the random hands and on its own worst case
+    for name in ("random7", "worstStraight", "worstFullHouse"):
+        cards = [[CARDS[code] for code in hand] for hand in corpora[name]]
+        for helper, function in helpers.items():
+            results[helper + "/" + name] = timeIt(function, cards, repeat)
+
+    return results
+
+
+def benchDecks(repeat):
+    """
+    Time deck operations of the headless deck and, if a display can be opened,
+    the sprite deck
+
+    :param repeat: runs per measurement
+    :return: dictionary of benchmark name to timing
+    """
+
+    results = {}
+    rounds = list(range(200))
+
+    def coreRound(i):
+        deck = CoreDeck()
+        deck.setDefault()
+        deck.shuffle()
+        pile = CoreDeck()
+        for j in range(9):
+            pile.add(deck.draw())
+        deck.merge(pile)
+
+    deck = CoreDeck()
+    deck.setDefault()
+    results["coreDeck/setDefault"] = timeIt(lambda i: deck.setDefault(), rounds, repeat)
+    results["coreDeck/shuffle"] = timeIt(lambda i: deck.shuffle(), rounds, repeat)
+    results["coreDeck/round"] = timeIt(coreRound, rounds, repeat)
+
+    # Returning a dealt pile, without the deal
+    corePile = CoreDeck()
+
+    def coreDeal(i):
+        for j in range(9):
+            corePile.add(deck.draw())
+        return corePile
+
+    results["coreDeck/merge"] = timeStep(coreDeal, deck.merge, rounds, repeat)
+
+    slotDeck = SlotDeck()
+    slotPile = slotDeck.pile(range(9))
+
+    def slotRound(i):
+        slotDeck.reset()
+        for j in range(9):
+            slotDeck.draw()
+        slotPile.cards()
+
+    results["slotDeck/round"] = timeIt(slotRound, rounds, repeat)
+
+    # A slot deck takes its cards back with reset
+    def slotDeal(i):
+        for j in range(9):
+            slotDeck.draw()
+
+    results["slotDeck/reset"] = timeStep(slotDeal, lambda dealt: slotDeck.reset(), rounds, repeat)
+
+    try:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        from deck import Deck
+    except Exception as error:
+        print("skipping sprite deck:", error, file=sys.stderr)
+        return results
+
+    spriteDeck = Deck()
+    spriteDeck.setDefault()
+    pile = Deck()
+
+    def draw(returned):
+        for j in range(9):
+            pile.add(spriteDeck.draw())
+
+    def deal(i):
+        draw(None)
+        return pile
+
+    results["deck/setDefault"] = timeIt(lambda i: Deck().setDefault(), rounds[:20], repeat)
+    results["deck/shuffle"] = timeIt(lambda i: spriteDeck.shuffle(), rounds, repeat)
+    # Draw 9 cards (the last pile goes back untimed), then merge a dealt pile back on its own
+    results["deck/draw"] = timeStep(lambda i: spriteDeck.merge(pile), draw, rounds, repeat)
+    spriteDeck.merge(pile)
+    results["deck/merge"] = timeStep(deal, spriteDeck.merge, rounds, repeat)
+    return results
+
+
+def compare(old, new, threshold):
+    """
+    Print the speed change of every benchmark in both runs
+
+    :param old: results of the earlier run
+    :param new: results of this run
+    :param threshold: relative slowdown that counts as a regression
+    :return: list of regressed benchmark names
+    """
+
+    regressions = []
+    for name in sorted(new):
+        if name not in old:
+            continue
+        ratio = new[name]["nsPerCall"] / max(old[name]["nsPerCall"], 1e-9)
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print("{:45} {:10.1f} -> {:10.1f} ns  x{:.2f}{}".format(
+            name, old[name]["nsPerCall"], new[name]["nsPerCall"], ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hand evaluators and decks")
+    parser.add_argument("--out", default="bench_output.json", help="JSON file to write")
+    parser.add_argument("--quick", action="store_true", help="smaller corpora and fewer runs")
+    parser.add_argument("--compare", help="earlier JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown reported as a regression")
+    args = parser.parse_args()
+
+    count = CORPUS_SIZE // 10 if args.quick else CORPUS_SIZE
+    repeat = 2 if args.quick else REPEAT
+
+    results = benchEvaluators(count, repeat)
+    results.update(benchDecks(repeat))
+    report = {
+        "meta": {
+            "seed": SEED,
+            "corpusSize": count,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=1, sort_keys=True)
+    print("Wrote", len(results), "results to", args.out)
+
+    if args.compare:
+        with open(args.compare) as file:
+            old = json.load(file)["results"]
+        if compare(old, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
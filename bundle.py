@@ -0,0 +1,148 @@
+import io
+import os
+import struct
+import pygame
+from core import suitOf, valueOf
+
+##
+# Asset bundle
+#  Packs the 52 card images and the card back into one file so startup reads
+#  a single file with a single call.  The index stores every image's size, so
+#  sprites get their rects without decoding; images are decoded on first use.
+#
+#  Build it once with: python bundle.py
+
+MAGIC = b"PKRBNDL1"
+HEADER = struct.Struct("<8sI")
+ENTRY = struct.Struct("<HIIHH")  # name length, offset, size, width, height
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(DIRECTORY, "cards.bundle")
+
+
+def assetNames():
+    """
+    Get the file names of every card image and the card back
+
+    :return: list of file names
+    """
+
+    return [str(valueOf(code)) + suitOf(code) + ".gif" for code in range(52)] + ["cardBack.png"]
+
+
+def build(path=DEFAULT_PATH, names=None, directory=DIRECTORY):
+    """
+    Pack image files into a bundle
+
+    :param path: bundle file to write
+    :param names: file names to pack (every card and the card back by default)
+    :param directory: directory holding the files
+    :return: int - number of images packed
+    """
+
+    if names is None:
+        names = assetNames()
+
+    blobs = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as file:
+            data = file.read()
+        # Decode once to record the size (no display needed)
+        width, height = pygame.image.load(io.BytesIO(data), name).get_size()
+        blobs.append((name.encode(), data, width, height))
+
+    # Data starts after the header and the index
+    offset = HEADER.size + sum(ENTRY.size + len(name) for name, data, width, height in blobs)
+    index = b""
+    for name, data, width, height in blobs:
+        index += ENTRY.pack(len(name), offset, len(data), width, height) + name
+        offset += len(data)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(blobs)) + index)
+        for name, data, width, height in blobs:
+            file.write(data)
+    os.replace(tmp, path)
+    return len(blobs)
+
+
+##
+# Bundle class
+#  images of a bundle file, read with one call and decoded on demand
+class Bundle:
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Read the bundle file and its index
+
+        :param path: bundle file written by build()
+        """
+
+        with open(path, "rb") as file:
+            self._data = memoryview(file.read())
+
+        magic, count = HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise ValueError("not an asset bundle: " + path)
+
+        self._entries = {}
+        pos = HEADER.size
+        for i in range(count):
+            length, offset, size, width, height = ENTRY.unpack_from(self._data, pos)
+            pos += ENTRY.size
+            name = bytes(self._data[pos:pos + length]).decode()
+            pos += length
+            self._entries[name] = (offset, size, width, height)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def size(self, name):
+        """
+        Get the size of an image without decoding it
+
+        :param name: file name
+        :return: width and height
+        """
+
+        offset, size, width, height = self._entries[name]
+        return width, height
+
+    def load(self, name):
+        """
+        Decode an image
+
+        :param name: file name
+        :return: pygame surface (not converted)
+        """
+
+        offset, size, width, height = self._entries[name]
+        return pygame.image.load(io.BytesIO(self._data[offset:offset + size]), name)
+
+
+_bundle = None
+_loaded = False
+
+
+def getBundle():
+    """
+    Get the default bundle, reading it the first time
+
+    :return: Bundle, or None if there is no bundle file
+    """
+
+    global _bundle, _loaded
+    if not _loaded:
+        _loaded = True
+        if os.path.exists(DEFAULT_PATH):
+            _bundle = Bundle(DEFAULT_PATH)
+    return _bundle
+
+
+def main():
+    count = build()
+    print("Packed", count, "images into", DEFAULT_PATH)
+
+
+if __name__ == "__main__":
+    main()
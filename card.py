@@ -1,4 +1,51 @@
 import pygame
+from bundle import getBundle
+from core import cardCode
+
+# Decoded images shared by every sprite, keyed by file name
+_images = {}
+
+
+def getImage(filename):
+    """
+    Get the decoded image of a file, loading it only the first time
+
+    :param filename: image file name
+    :return: pygame surface (shared, do not draw on it)
+    """
+
+    img = _images.get(filename)
+    if img is None:
+        # Decode from the asset bundle when it has the file
+        bundle = getBundle()
+        if bundle is not None and filename in bundle:
+            img = bundle.load(filename).convert()
+        else:
+            img = pygame.image.load(filename).convert()
+        _images[filename] = img
+    return img
+
+
+def getImageSize(filename):
+    """
+    Get the size of an image, without decoding it if the asset bundle has it
+
+    :param filename: image file name
+    :return: width and height
+    """
+
+    bundle = getBundle()
+    if filename not in _images and bundle is not None and filename in bundle:
+        return bundle.size(filename)
+    return getImage(filename).get_size()
+
+
+def clearImages():
+    """
+    Forget all decoded images (needed after the display is re-created)
+    """
+
+    _images.clear()
 
 
 ##
@@ -26,12 +73,21 @@ class ImageSprite(pygame.sprite.Sprite):
         :param filename: image file name
         """
 
-        img = pygame.image.load(filename).convert()
-        self.image = img
-        self.rect = self.image.get_rect()
+        self._imageFile = filename
+        self.rect = pygame.Rect((0, 0), getImageSize(filename))
         self.rect.x = x
         self.rect.y = y - self.rect.height
 
+    @property
+    def image(self):
+        """
+        Get the sprite image, decoded on first use
+
+        :return: pygame surface
+        """
+
+        return getImage(self._imageFile)
+
     def moveBy(self, dx, dy):
         """
         Move the sprite by dx and dy
@@ -59,6 +115,7 @@ class Card(ImageSprite):
 
         self._suit = suit[0].lower()
         self._value = value
+        self._code = cardCode(self._suit, value)
         if filename == "":
             self._filename = str(value) + self._suit + ".gif"
         else:
@@ -91,6 +148,15 @@ class Card(ImageSprite):
         """
         return self._value
 
+    def getCode(self):
+        """
+        get card code (see core.py)
+
+        :return: int - card code (0 ~ 51)
+        """
+
+        return self._code
+
     def getFilename(self):
         """
         get card sprite file name
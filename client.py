@@ -0,0 +1,316 @@
+import asyncio
+import socket
+from protocol import decodeState
+
+##
+# Table clients
+#  AsyncClient drives tables of a server.py process from asyncio code.
+#  RemoteEngine is a blocking client with the PokerEngine interface, so the
+#  pygame UI can play on a server table: Poker(600, 400, engine=RemoteEngine())
+
+
+##
+# AsyncClient class
+#  asyncio client for the table protocol
+class AsyncClient:
+    def __init__(self, reader, writer):
+        """
+        Wrap an open connection (use AsyncClient.connect)
+
+        :param reader: asyncio StreamReader
+        :param writer: asyncio StreamWriter
+        """
+
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=7777, unix=None):
+        """
+        Connect to a server
+
+        :param host: TCP host
+        :param port: TCP port
+        :param unix: Unix socket path (used instead of TCP when given)
+        :return: AsyncClient
+        """
+
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, *words):
+        """
+        Send one request and wait for its reply
+
+        :param words: command and arguments
+        :return: dictionary of the reply fields
+        """
+
+        return (await self.pipeline([words]))[0]
+
+    async def pipeline(self, requests):
+        """
+        Send several requests at once and read their replies in order
+
+        :param requests: list of (command, arguments...) tuples
+        :return: list of reply dictionaries
+        """
+
+        self._writer.write(b"".join((" ".join(str(word) for word in words) + "\n").encode() for words in requests))
+        await self._writer.drain()
+        replies = []
+        for i in range(len(requests)):
+            line = await self._reader.readline()
+            if line.startswith(b"ERR"):
+                raise ValueError(line.decode().strip())
+            replies.append(decodeState(line))
+        return replies
+
+    async def newTable(self, bank=500, minWage=20, seed=None):
+        """
+        Open a table
+
+        :param bank: chips the player starts with
+        :param minWage: wager paid at the start of every round
+        :param seed: seed of the table's deck (random when None)
+        :return: int - table id
+        """
+
+        words = ("NEW", bank, minWage) if seed is None else ("NEW", bank, minWage, seed)
+        return (await self.request(*words))["table"]
+
+    async def close(self):
+        """
+        Say goodbye and close the connection
+        """
+
+        self._writer.write(b"QUIT\n")
+        await self._writer.drain()
+        await self._reader.readline()
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+##
+# RemoteEngine class
+#  a PokerEngine look-alike playing on a server table over a blocking socket
+class RemoteEngine:
+    def __init__(self, host="127.0.0.1", port=7777, unix=None, bank=500, minWage=20, seed=None):
+        """
+        Connect to a server and open a table
+
+        :param host: TCP host
+        :param port: TCP port
+        :param unix: Unix socket path (used instead of TCP when given)
+        :param bank: chips the player starts with
+        :param minWage: wager paid at the start of every round
+        :param seed: seed of the table's deck (random when None)
+        """
+
+        if unix:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(unix)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile("rwb")
+        self._reply = self._request(*(("NEW", bank, minWage) if seed is None else ("NEW", bank, minWage, seed)))
+        self._table = self._reply["table"]
+
+    def _request(self, *words):
+        """
+        Send one request and keep the table state of its reply
+
+        :param words: command and arguments
+        :return: dictionary of the reply fields
+        """
+
+        self._file.write((" ".join(str(word) for word in words) + "\n").encode())
+        self._file.flush()
+        line = self._file.readline()
+        if not line or line.startswith(b"ERR"):
+            raise ConnectionError(line.decode().strip() or "server closed the connection")
+        self._reply = decodeState(line)
+        return self._reply
+
+    def _action(self, command, *args):
+        """
+        Carry out an action on the table
+
+        :param command: protocol command
+        :param args: command arguments
+        :return: True if the server carried it out
+        """
+
+        return self._request(command, self._table, *args)["ok"]
+
+    def state(self):
+        """
+        Get the game state (see PokerEngine.state)
+        """
+
+        return self._reply["state"]
+
+    def bank(self):
+        """
+        Get the player's chips (see PokerEngine.bank)
+        """
+
+        return self._reply["bank"]
+
+    def pot(self):
+        """
+        Get the chips in the pot (see PokerEngine.pot)
+        """
+
+        return self._reply["pot"]
+
+    def minWage(self):
+        """
+        Get the wager paid at the start of every round (see PokerEngine.minWage)
+        """
+
+        return self._reply["minWage"]
+
+    def win(self):
+        """
+        Get the result of the last round (see PokerEngine.win)
+        """
+
+        return self._reply["win"]
+
+    def shownDown(self):
+        """
+        Check if the last round ended with a showdown (see PokerEngine.shownDown)
+        """
+
+        return self._reply["shownDown"]
+
+    def communityCards(self):
+        """
+        Get the community card codes (see PokerEngine.communityCards)
+        """
+
+        return self._reply["communityCards"]
+
+    def playerCards(self):
+        """
+        Get the player's hole card codes (see PokerEngine.playerCards)
+        """
+
+        return self._reply["playerCards"]
+
+    def AICards(self):
+        """
+        Get the AI's hole cards
+
+        :return: a list of card codes (None while hidden)
+        """
+
+        return self._reply["AICards"]
+
+    def seats(self):
+        """
+        Get the number of seats (server tables are heads-up)
+
+        :return: int - always 2
+        """
+
+        return 2
+
+    def seatCards(self, seat):
+        """
+        Get the hole card codes of a seat (see PokerEngine.seatCards)
+        """
+
+        return self.playerCards() if seat == 0 else self.AICards()
+
+    def inHand(self, seat):
+        """
+        Check if a seat is still in the round (server AI seats never fold)
+
+        :return: always True
+        """
+
+        return True
+
+    def toCall(self):
+        """
+        Get the AI's bet the player must call (server tables have no deciding AI)
+
+        :return: int - always 0
+        """
+
+        return 0
+
+    def AIAction(self, seat=1):
+        """
+        Get the last decision of an AI seat (server tables have no deciding AI)
+
+        :return: always None
+        """
+
+        return None
+
+    def start(self):
+        """
+        Leave the title screen and start dealing the first round (see PokerEngine.start)
+        """
+
+        return self._action("START")
+
+    def dealNext(self):
+        """
+        Deal the next card of the setup phase
+
+        :return: True if a card was dealt, or None
+        """
+
+        return self._action("DEAL") or None
+
+    def deal(self):
+        """
+        Deal every card of the setup phase at once (see PokerEngine.deal)
+        """
+
+        self._action("DEALALL")
+
+    def check(self):
+        """
+        Check: deal the next community card (see PokerEngine.check)
+        """
+
+        return self._action("CHECK")
+
+    def raiseBet(self, wage):
+        """
+        Raise by a wager (see PokerEngine.raiseBet)
+        """
+
+        return self._action("RAISE", wage)
+
+    def fold(self):
+        """
+        Fold the round (see PokerEngine.fold)
+        """
+
+        return self._action("FOLD")
+
+    def rebet(self):
+        """
+        Bet again and start a new round (see PokerEngine.rebet)
+        """
+
+        return self._action("REBET")
+
+    def close(self):
+        """
+        Say goodbye and close the connection
+        """
+
+        self._file.write(b"QUIT\n")
+        self._file.flush()
+        self._file.close()
+        self._socket.close()
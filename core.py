@@ -0,0 +1,372 @@
+from rng import stream
+
+##
+# Headless card core
+#  Cards are small integer codes: suit index * 13 + value - 1, with suits in
+#  the order spades, hearts, clubs, diamonds (the order Deck.setDefault uses).
+#  Nothing here imports pygame; card sprites are a view on top of the codes.
+
+SUITS = ('s', 'h', 'c', 'd')
+SUIT_NAMES = ("Spades", "Hearts", "Clubs", "Diamonds")
+VALUE_NAMES = ("", "Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King")
+
+
+def cardCode(suit, value):
+    """
+    Get the code of a card
+
+    :param suit: suit of the card (s, h, c, d)
+    :param value: value of the card (1 ~ 13)
+    :return: int - card code (0 ~ 51)
+    """
+
+    return SUITS.index(suit[0].lower()) * 13 + value - 1
+
+
+def suitOf(code):
+    """
+    Get the suit letter of a card code
+
+    :param code: card code (0 ~ 51)
+    :return: string - s, h, c or d
+    """
+
+    return SUITS[code // 13]
+
+
+def valueOf(code):
+    """
+    Get the value of a card code
+
+    :param code: card code (0 ~ 51)
+    :return: int - card value (1 ~ 13)
+    """
+
+    return code % 13 + 1
+
+
+def cardName(code):
+    """
+    Get the name of a card code
+
+    :param code: card code (0 ~ 51)
+    :return: string - [value] of [suit]
+    """
+
+    return VALUE_NAMES[valueOf(code)] + " of " + SUIT_NAMES[code // 13]
+
+
+##
+# CoreCard class
+#  a lightweight card value with the same interface as card.Card
+class CoreCard:
+    __slots__ = ("_code",)
+
+    def __init__(self, code):
+        """
+        Initialize the card with its code
+
+        :param code: card code (0 ~ 51)
+        """
+
+        self._code = code
+
+    def getCode(self):
+        """
+        get card code
+
+        :return: int - card code
+        """
+
+        return self._code
+
+    def getSuit(self):
+        """
+        Get suit in its full form
+
+        :return: string of suit
+        """
+
+        return SUIT_NAMES[self._code // 13]
+
+    def getValue(self):
+        """
+        get card value
+
+        :return: int - card value
+        """
+
+        return self._code % 13 + 1
+
+    def __gt__(self, card):
+        """
+        self > card if the value is greater (aces are highest)
+
+        :param card: a card object
+        :return: True or False
+        """
+
+        return (self.getValue() + 11) % 13 > (card.getValue() + 11) % 13
+
+    def __lt__(self, card):
+        """
+        self < card if the value is less (aces are highest)
+
+        :param card: a card object
+        :return: True or False
+        """
+
+        return (self.getValue() + 11) % 13 < (card.getValue() + 11) % 13
+
+    def eq(self, card):
+        """
+        Check if the card values are equal
+
+        :param card: a card object
+        :return: True or false
+        """
+
+        return card.getValue() == self.getValue()
+
+    def __repr__(self):
+        """
+        Get return string for the class
+
+        :return: string - [value] of [suit]
+        """
+
+        return cardName(self._code)
+
+
+# One shared value object per card
+CARDS = tuple(CoreCard(code) for code in range(52))
+
+
+##
+# CoreDeck class
+#  A deck of card codes stored in a bytearray
+class CoreDeck:
+    def __init__(self, codes=b"", rng=None):
+        """
+        Creates a deck holding the given card codes
+
+        :param codes: iterable of card codes (empty by default)
+        :param rng: random.Random to shuffle with (see rng.stream), a new unseeded stream by default
+        """
+
+        self._cards = bytearray(codes)
+        self._rng = rng if rng is not None else stream()
+
+    def setDefault(self):
+        """
+        Set deck to to the standard 52-cards deck
+        """
+
+        self._cards = bytearray(range(52))
+
+    def add(self, code):
+        """
+        Add a card code to the deck
+
+        :param code: card code
+        """
+
+        self._cards.append(code)
+
+    def cards(self):
+        """
+        Get the card codes in the deck
+
+        :return: a list of card codes
+        """
+
+        return list(self._cards)
+
+    def shuffle(self):
+        """
+        Shuffle the deck
+        """
+
+        self._rng.shuffle(self._cards)
+
+    def draw(self):
+        """
+        Draws the top card from the deck and remove it
+
+        :return: int - the last card code, or None if the deck is empty
+        """
+
+        if len(self._cards) == 0:
+            return None
+        return self._cards.pop()
+
+    def empty(self):
+        """
+        Empty the deck
+        """
+
+        del self._cards[:]
+
+    def size(self):
+        """
+        Get the number of cards in the deck
+
+        :return: int - number of cards
+        """
+
+        return len(self._cards)
+
+    def merge(self, deck):
+        """
+        Move all cards from other deck to this deck
+
+        :param deck: Another deck of card codes
+        """
+
+        self._cards += deck._cards
+        deck.empty()
+
+    def __add__(self, deck):
+        return CoreDeck(self._cards + bytearray(deck))
+
+    def __getitem__(self, num):
+        """
+        Gets a card code given its position at the deck
+
+        :param num: card number from bottom up
+        :return: int - card code
+        """
+
+        return self._cards[num]
+
+    def __iter__(self):
+        """
+        Make Deck iterable
+
+        :return: iterator over card codes
+        """
+
+        return iter(self._cards)
+
+    def __len__(self):
+        return len(self._cards)
+
+
+##
+# SlotDeck class
+#  52 card codes in fixed slots and a cursor: slots before the cursor are
+#  dealt, in the order they were dealt.  Drawing swaps a random undealt card
+#  to the cursor (one step of a Fisher-Yates shuffle), so only the cards
+#  actually dealt are shuffled, and reset only moves the cursor back.  Piles
+#  are views on given deal positions, so they empty themselves on reset.
+class SlotDeck:
+    def __init__(self, rng=None):
+        """
+        Creates a full deck with nothing dealt
+
+        :param rng: random.Random to shuffle with (see rng.stream), a new unseeded stream by default
+        """
+
+        self._slots = bytearray(range(52))
+        self._dealt = 0
+        self._randrange = (rng if rng is not None else stream()).randrange
+
+    def reset(self):
+        """
+        Return every dealt card to the deck
+        """
+
+        self._dealt = 0
+
+    def draw(self):
+        """
+        Deal a random card from the undealt ones
+
+        :return: int - card code, or None if every card is dealt
+        """
+
+        dealt = self._dealt
+        if dealt == 52:
+            return None
+        slots = self._slots
+        pick = self._randrange(dealt, 52)
+        slots[dealt], slots[pick] = slots[pick], slots[dealt]
+        self._dealt = dealt + 1
+        return slots[dealt]
+
+    def dealt(self):
+        """
+        Get the number of dealt cards
+
+        :return: int - cards dealt since the last reset
+        """
+
+        return self._dealt
+
+    def size(self):
+        """
+        Get the number of undealt cards
+
+        :return: int - number of cards
+        """
+
+        return 52 - self._dealt
+
+    def pile(self, positions):
+        """
+        Get a view of some of the dealt cards
+
+        :param positions: deal positions (0 is the first card dealt) in pile order
+        :return: Pile
+        """
+
+        return Pile(self, positions)
+
+    def __len__(self):
+        return 52 - self._dealt
+
+
+##
+# Pile class
+#  the cards a SlotDeck dealt at some deal positions
+class Pile:
+    def __init__(self, deck, positions):
+        """
+        Creates a view of a deck
+
+        :param deck: SlotDeck
+        :param positions: deal positions in pile order
+        """
+
+        self._deck = deck
+        self._positions = tuple(positions)
+
+    def size(self):
+        """
+        Get the number of cards dealt to the pile
+
+        :return: int - number of cards
+        """
+
+        dealt = self._deck._dealt
+        return sum(1 for position in self._positions if position < dealt)
+
+    def cards(self):
+        """
+        Get the card codes dealt to the pile
+
+        :return: a list of card codes
+        """
+
+        dealt = self._deck._dealt
+        slots = self._deck._slots
+        return [slots[position] for position in self._positions if position < dealt]
+
+    def __getitem__(self, num):
+        return self.cards()[num]
+
+    def __iter__(self):
+        return iter(self.cards())
+
+    def __len__(self):
+        return self.size()
@@ -1,17 +1,21 @@
 from card import Card
-import random
+from core import suitOf, valueOf
+from rng import stream
 
 
 ##
 # Deck class
 #  A deck with a list of cards
 class Deck:
-    def __init__(self):
+    def __init__(self, rng=None):
         """
         Creates an empty list of cards
+
+        :param rng: random.Random to shuffle with (see rng.stream), a new unseeded stream by default
         """
 
         self._cards = []
+        self._rng = rng if rng is not None else stream()
 
     def setDefault(self):
         """
@@ -19,9 +23,8 @@ class Deck:
         """
 
         self.empty()
-        for suit in ['s', 'h', 'c', 'd']:
-            for val in range(1, 14):
-                self._cards.append(Card(suit, val))
+        for code in range(52):
+            self._cards.append(Card(suitOf(code), valueOf(code)))
 
     def add(self, card, position=(-1, -1)):
         """
@@ -50,7 +53,7 @@ class Deck:
         Shuffle the deck (randomize cards list)
         """
 
-        random.shuffle(self._cards)
+        self._rng.shuffle(self._cards)
 
     def draw(self):
         """
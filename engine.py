@@ -0,0 +1,513 @@
+import history
+import rng
+from core import SlotDeck
+from ai import CHECK, CALL, RAISE, FOLD
+from handstate import HandState
+from showdown import Showdown, MAX_SEATS
+
+# Game states (same numbering as Poker._gameState)
+TITLE = 0
+DEALING = 1
+PLAYING = 2
+OVER = 3
+
+# Round results
+LOST = 0
+WON = 1
+DRAW = 2
+
+
+def dealPositions(seats):
+    """
+    Get the deal positions of the piles: 3 community cards, 2 cards for every
+    seat in turn, then the 4th and 5th community cards
+
+    :param seats: number of seats
+    :return: community card positions and a list of hole card positions per seat
+    """
+
+    holes = [(3 + 2 * seat, 4 + 2 * seat) for seat in range(seats)]
+    return (0, 1, 2, 3 + 2 * seats, 4 + 2 * seats), holes
+
+
+##
+# PokerEngine class
+#  the rules of the game as a state machine, without pygame.  Seat 0 is the
+#  player, the other seats are AI opponents that all act on the player's
+#  chips: each one still in the round matches every wager.
+class PokerEngine:
+    def __init__(self, bank=500, minWage=20, ai=None, recorder=None, seed=None, seats=2):
+        """
+        Set up a table on the title screen
+
+        :param bank: chips the player starts with
+        :param minWage: wager paid at the start of every round
+        :param ai: an ai.AIPlayer that decides for the AI seats (None: the AI checks and calls everything)
+        :param recorder: a history.HistoryWriter that gets a HandRecord at the end of every round (2 seats only)
+        :param seed: seed of the table's deck, so its deals can be replayed (random when None)
+        :param seats: number of seats, 2 ~ 9
+        """
+
+        if not 2 <= seats <= MAX_SEATS:
+            raise ValueError("a table has 2 to " + str(MAX_SEATS) + " seats")
+        if recorder is not None and seats != 2:
+            raise ValueError("hand histories record heads-up tables only")
+
+        self._seats = seats
+        self._deck = SlotDeck(rng.stream(seed, "deck"))
+        community, holes = dealPositions(seats)
+        self._communityCards = self._deck.pile(community)
+        self._seatCards = [self._deck.pile(positions) for positions in holes]
+        self._playerCards = self._seatCards[0]
+        self._AICards = self._seatCards[1]
+        self._inHand = [True] * seats
+        self._ranking = None
+
+        # Hand states follow the deal: the board alone and every seat's hole
+        # cards with the board; owner of every deal position (None: the board)
+        self._boardState = HandState()
+        self._handStates = [HandState() for seat in range(seats)]
+        self._owners = [None] * (5 + 2 * seats)
+        for seat, positions in enumerate(holes):
+            for position in positions:
+                self._owners[position] = seat
+
+        self._state = TITLE
+        self._minWage = minWage
+        self._bank = bank
+        self._pot = 0
+        self._win = LOST
+        self._shownDown = False
+
+        self._ai = ai
+        self._toCall = 0
+        self._AIActions = [None] * seats
+        self._AIRaised = False
+
+        # Round record
+        self._recorder = recorder
+        self._actions = []
+        self._roundBank = bank
+
+    def state(self):
+        """
+        Get the game state
+
+        :return: TITLE, DEALING, PLAYING or OVER
+        """
+
+        return self._state
+
+    def bank(self):
+        """
+        Get the player's chips
+
+        :return: int - bank
+        """
+
+        return self._bank
+
+    def pot(self):
+        """
+        Get the chips in the pot
+
+        :return: int - pot
+        """
+
+        return self._pot
+
+    def minWage(self):
+        """
+        Get the wager paid at the start of every round
+
+        :return: int - minimum wager
+        """
+
+        return self._minWage
+
+    def win(self):
+        """
+        Get the result of the last round
+
+        :return: LOST, WON or DRAW
+        """
+
+        return self._win
+
+    def shownDown(self):
+        """
+        Check if the last round ended with a showdown (AI cards revealed)
+
+        :return: True or False
+        """
+
+        return self._shownDown
+
+    def communityCards(self):
+        """
+        Get the community card codes
+
+        :return: a list of card codes
+        """
+
+        return self._communityCards.cards()
+
+    def playerCards(self):
+        """
+        Get the player's hole card codes
+
+        :return: a list of card codes
+        """
+
+        return self._playerCards.cards()
+
+    def AICards(self):
+        """
+        Get the hole card codes of the first AI seat
+
+        :return: a list of card codes
+        """
+
+        return self._AICards.cards()
+
+    def seats(self):
+        """
+        Get the number of seats
+
+        :return: int - seats, the player's included
+        """
+
+        return self._seats
+
+    def seatCards(self, seat):
+        """
+        Get the hole card codes of a seat
+
+        :param seat: 0 (the player) ~ seats - 1
+        :return: a list of card codes
+        """
+
+        return self._seatCards[seat].cards()
+
+    def inHand(self, seat):
+        """
+        Check if a seat is still in the round
+
+        :param seat: seat number
+        :return: False once the seat folded
+        """
+
+        return self._inHand[seat]
+
+    def handState(self, seat):
+        """
+        Get the hand state of a seat: its hole cards and the board dealt so far
+
+        :param seat: seat number
+        :return: handstate.HandState (do not modify)
+        """
+
+        return self._handStates[seat]
+
+    def boardState(self):
+        """
+        Get the hand state of the board dealt so far
+
+        :return: handstate.HandState (do not modify)
+        """
+
+        return self._boardState
+
+    def ranking(self):
+        """
+        Get the showdown of the last round
+
+        :return: showdown.Showdown, or None if the round did not end with a showdown
+        """
+
+        return self._ranking
+
+    def toCall(self):
+        """
+        Get the AI's bet the player must call (check) to stay in the round
+
+        :return: int - chips to call, 0 if there is no bet
+        """
+
+        return self._toCall
+
+    def AIAction(self, seat=1):
+        """
+        Get the last decision of an AI seat in the round
+
+        :param seat: AI seat number
+        :return: (action, amount) as returned by AIPlayer.decide (CALL when it checked a raise), or None
+        """
+
+        return self._AIActions[seat]
+
+    def start(self):
+        """
+        Leave the title screen and start dealing the first round
+
+        :return: True if the round started
+        """
+
+        if self._state != TITLE:
+            return False
+        self._state = DEALING
+        self._roundBank = self._bank
+        self.wage(self._minWage)
+        return True
+
+    def dealNext(self):
+        """
+        Deal the next card of the setup phase: 3 community cards, then 2 cards
+        for every seat
+
+        :return: int - card code dealt, or None if nothing was dealt
+        """
+
+        if self._state != DEALING:
+            return None
+
+        # The piles see the card at its deal position
+        card = self._draw()
+
+        # Update state to playing
+        if self._deck.dealt() == 3 + 2 * self._seats:
+            self._state = PLAYING
+        return card
+
+    def deal(self):
+        """
+        Deal every card of the setup phase at once
+        """
+
+        while self._state == DEALING:
+            self.dealNext()
+
+    def check(self):
+        """
+        Check (or call the AI's bet): the AI may bet, otherwise the next community card is dealt
+
+        :return: True if the action was taken
+        """
+
+        if self._state != PLAYING:
+            return False
+        if self._toCall:
+            self._actions.append((history.CALL, self._toCall))
+            self._call()
+        else:
+            self._actions.append((history.CHECK, 0))
+            if self._AIDecide(0):
+                return True
+        self._nextStreet()
+        return True
+
+    def raiseBet(self, wage):
+        """
+        Raise (after calling the AI's bet): every AI seat folds, calls or raises
+        again, and the next community card is dealt once they call
+
+        :param wage: int - wager, at most the bank left after calling
+        :return: True if the raise was accepted
+        """
+
+        if self._state != PLAYING or wage < 0 or wage + self._toCall > self._bank:
+            return False
+        if self._toCall:
+            self._call()
+        self._actions.append((history.RAISE, wage))
+        if self._ai is None:
+            self._actions.append((history.AI | history.CALL, wage))
+            self.wage(wage)
+            self._nextStreet()
+            return True
+
+        self._bank -= wage
+        self._pot += wage
+        if not self._AIDecide(wage):
+            self._nextStreet()
+        return True
+
+    def fold(self):
+        """
+        Fold: the pot is lost and the round is over
+
+        :return: True if the action was taken
+        """
+
+        if self._state != PLAYING:
+            return False
+        self._actions.append((history.FOLD, 0))
+        pot = self._pot
+        self._pot = 0
+        self._toCall = 0
+        self._win = LOST
+        self._shownDown = False
+        self._state = OVER
+        self._endRound(pot)
+        return True
+
+    def rebet(self):
+        """
+        Bet again: return every card to the deck and start a new round
+
+        :return: True if a new round started (the bank must exceed the minimum wager)
+        """
+
+        if self._state != OVER or self._bank <= self._minWage:
+            return False
+
+        self._state = DEALING
+        self._pot = 0
+        self._shownDown = False
+        self._ranking = None
+        self._inHand = [True] * self._seats
+        self._boardState.reset()
+        for state in self._handStates:
+            state.reset()
+        self._AIActions = [None] * self._seats
+        self._AIRaised = False
+        self._actions = []
+        self._roundBank = self._bank
+        self.wage(self._minWage)
+
+        # Return cards to deck (the piles empty with it)
+        self._deck.reset()
+        return True
+
+    def wage(self, wage):
+        """
+        Update the pot and bank with given wage (every AI seat in the round matches it)
+
+        :param wage: a wager that is <= to the bank
+        """
+
+        # Only wage if player have enough bank
+        if self._bank >= wage:
+            self._pot += wage * sum(self._inHand)
+            self._bank -= wage
+
+    def _call(self):
+        """
+        Put the chips of the AI's bet in the pot for the player
+        """
+
+        self._bank -= self._toCall
+        self._pot += self._toCall
+        self._toCall = 0
+
+    def _AIDecide(self, wage):
+        """
+        Let every AI seat in the round act on the player's check or raise
+
+        :param wage: the player's raise, already in the pot (0 for a check)
+        :return: True if the AI seats all folded or one raised (the street is not over)
+        """
+
+        if self._ai is None:
+            return False
+
+        board = self._communityCards.cards()
+        raised = 0
+        for seat in range(1, self._seats):
+            if not self._inHand[seat]:
+                continue
+            facing = wage + raised
+            action, amount = self._ai.decide(self._seatCards[seat].cards(), board, self._pot, facing,
+                                             self._bank, not self._AIRaised, self._handStates[seat],
+                                             self._boardState)
+            self._AIActions[seat] = (CALL, facing) if action == CHECK and facing else (action, amount)
+            if seat == 1:
+                opcode = {CHECK: history.CALL if facing else history.CHECK, RAISE: history.RAISE,
+                          FOLD: history.FOLD}[action]
+                self._actions.append((history.AI | opcode, facing if action == CHECK else amount))
+
+            if action == FOLD:
+                self._inHand[seat] = False
+            elif action == RAISE:
+                # Only one raise a street, the seats before it call it
+                raised = amount
+                self._AIRaised = True
+
+        # Every seat still in puts in the player's raise and any AI raise
+        for seat in range(1, self._seats):
+            if self._inHand[seat]:
+                self._pot += wage + raised
+        if not any(self._inHand[1:]):
+            # The player takes the pot back, no AI seat matched the raise
+            self._bank += self._pot
+            self._win = WON
+            self._shownDown = False
+            self._state = OVER
+            self._endRound(self._pot)
+            return True
+        if raised:
+            self._toCall = raised
+            return True
+        return False
+
+    def _nextStreet(self):
+        """
+        Deal the 4th or 5th community card and show down once all five are out
+        """
+
+        self._AIRaised = False
+        last = 5 + 2 * self._seats
+        if self._deck.dealt() < last:
+            self._draw()
+        if self._deck.dealt() == last:
+            self._showdown()
+
+    def _draw(self):
+        """
+        Deal a card and add it to the hand states it belongs to
+
+        :return: int - card code
+        """
+
+        owner = self._owners[self._deck.dealt()]
+        card = self._deck.draw()
+        if owner is None:
+            self._boardState.add(card)
+            for state in self._handStates:
+                state.add(card)
+        else:
+            self._handStates[owner].add(card)
+        return card
+
+    def _showdown(self):
+        """
+        Rank the seats still in the round and pay the player's share of the pot
+        """
+
+        # The hand states already hold every seat's seven cards
+        self._ranking = Showdown([state.strength() if inHand else None
+                                  for state, inHand in zip(self._handStates, self._inHand)])
+        winners = self._ranking.winners
+
+        if 0 not in winners:
+            self._win = LOST
+        else:
+            self._bank += self._ranking.split(self._pot)[0]
+            self._win = WON if len(winners) == 1 else DRAW
+
+        self._shownDown = True
+        self._state = OVER
+        self._endRound(self._pot)
+
+    def _endRound(self, pot):
+        """
+        Record the round that just ended
+
+        :param pot: chips in the pot when the round ended
+        """
+
+        if self._recorder is not None:
+            self._recorder.append(history.HandRecord(self._communityCards.cards(), self._playerCards.cards(),
+                                                     self._AICards.cards(), self._actions, self._win,
+                                                     self._shownDown, self._minWage, self._bank - self._roundBank,
+                                                     pot))
@@ -0,0 +1,395 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import evaluator
+from evaluator import cardCode, addCard, addCards, finish, EMPTY_STATE
+from rng import streamSeed
+
+##
+# Equity calculator
+#  Estimates how often known hole cards win, tie or lose against random
+#  opponent hands given a partial board.  Trials run in batches spread across a
+#  process pool; every batch has its own random stream seeded from the run seed
+#  and the batch number, so a seeded run with a fixed number of trials gives the
+#  same answer on any number of workers.
+#
+#  When few enough deals remain (usually from the turn on), every deal is
+#  enumerated exactly instead.  Board prefixes are evaluated once as hand
+#  states and extended card by card for every runout and opponent hand.
+
+DEFAULT_TRIALS = 100000
+EXACT_LIMIT = 250000
+BATCH_SIZE = 2000
+Z_95 = 1.959964
+
+
+##
+# Equity class
+#  results of an equity calculation
+class Equity:
+    def __init__(self, wins, ties, losses, share, shareSquares, elapsed, exact=False):
+        """
+        Summarize the counts of an equity calculation
+
+        :param wins: trials won outright
+        :param ties: trials tied with the best opponent
+        :param losses: trials lost
+        :param share: sum of the pot share won in every trial
+        :param shareSquares: sum of the squared pot shares
+        :param elapsed: seconds spent
+        :param exact: True if every deal was enumerated
+        """
+
+        self.trials = wins + ties + losses
+        n = max(self.trials, 1)
+        self.win = wins / n
+        self.tie = ties / n
+        self.lose = losses / n
+        self.equity = share / n
+        variance = max(shareSquares / n - self.equity ** 2, 0.0)
+        # Half width of the 95% confidence interval of the equity
+        self.margin = 0.0 if exact else Z_95 * math.sqrt(variance / n)
+        self.exact = exact
+        self.elapsed = elapsed
+        self.trialsPerSecond = self.trials / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        """
+        Get return string for the class
+
+        :return: string - win/tie/lose percentages
+        """
+
+        return "win {:.2%} tie {:.2%} lose {:.2%} ({} {}, {:.0f}/s)".format(
+            self.win, self.tie, self.lose, self.trials, "deals" if self.exact else "trials", self.trialsPerSecond)
+
+
+def batchSeed(seed, batch):
+    """
+    Get the seed of one batch's random stream
+
+    :param seed: seed of the whole run
+    :param batch: batch number
+    :return: string seed for random.Random (hashed with SHA-512)
+    """
+
+    return streamSeed(seed, batch)
+
+
+def _checkCards(hole, board, opponents):
+    """
+    Convert and validate the known cards
+
+    :param hole: two cards (card objects or codes)
+    :param board: 0 ~ 5 community cards (card objects or codes)
+    :param opponents: number of opponents
+    :return: lists of hole and board card codes
+    """
+
+    hole = [cardCode(card) for card in hole]
+    board = [cardCode(card) for card in board]
+    if len(hole) != 2 or len(board) > 5 or len(set(hole + board)) != len(hole + board):
+        raise ValueError("need 2 distinct hole cards and at most 5 distinct board cards")
+    if opponents < 1 or 5 - len(board) + 2 * opponents > 50 - len(board):
+        raise ValueError("can not deal " + str(opponents) + " opponents")
+    return hole, board
+
+
+def deals(board, opponents):
+    """
+    Count the deals an exact enumeration has to walk
+
+    :param board: known community cards
+    :param opponents: number of opponents
+    :return: int - number of (runout, opponent hands) combinations
+    """
+
+    remaining = 50 - len(board)
+    missing = 5 - len(board)
+    count = math.comb(remaining, missing)
+    remaining -= missing
+    for seat in range(opponents):
+        count *= math.comb(remaining - 2 * seat, 2)
+    return count // math.factorial(opponents)
+
+
+def _enumerate(hole, board, opponents, first):
+    """
+    Enumerate every deal whose first runout card is remaining[first] (runs in a worker process)
+
+    :param hole: hero hole card codes
+    :param board: known board card codes
+    :param opponents: number of opponents
+    :param first: index of the first runout card, or None when the board is complete
+    :return: wins, ties, losses, sum of pot shares, sum of squared pot shares
+    """
+
+    known = set(hole) | set(board)
+    remaining = [code for code in range(52) if code not in known]
+    missing = 5 - len(board)
+    totals = [0, 0, 0, 0.0, 0.0]
+
+    def showdown(state, runout):
+        # Hero against every set of opponent hands for one complete board
+        hero = finish(addCards(state, hole))
+        rest = [code for code in remaining if code not in runout]
+
+        # Opponent hands share the board state and their first card's state
+        pairs = []
+        for i in range(len(rest)):
+            held = addCard(state, rest[i])
+            for j in range(i + 1, len(rest)):
+                pairs.append((finish(addCard(held, rest[j])), rest[i], rest[j]))
+
+        if opponents == 1:
+            for key, a, b in pairs:
+                count(hero, key, 0)
+        else:
+            chooseOpponents(hero, pairs, 0, opponents, set(), 0, 0)
+
+    def chooseOpponents(hero, pairs, start, left, used, best, tied):
+        # Every set of disjoint opponent hands, each set once
+        if left == 0:
+            count(hero, best, tied)
+            return
+        for pos in range(start, len(pairs)):
+            key, a, b = pairs[pos]
+            if a in used or b in used:
+                continue
+            used.add(a)
+            used.add(b)
+            if key > best:
+                chooseOpponents(hero, pairs, pos + 1, left - 1, used, key, 0)
+            elif key == best:
+                chooseOpponents(hero, pairs, pos + 1, left - 1, used, best, tied + 1)
+            else:
+                chooseOpponents(hero, pairs, pos + 1, left - 1, used, best, tied)
+            used.discard(a)
+            used.discard(b)
+
+    def count(hero, best, tied):
+        # tied counts the opponents holding best besides the first one
+        if hero > best:
+            totals[0] += 1
+            totals[3] += 1.0
+        elif hero == best:
+            part = 1.0 / (tied + 2)
+            totals[1] += 1
+            totals[3] += part
+            totals[4] += part * part
+        else:
+            totals[2] += 1
+
+    def runouts(state, start, runout):
+        # Extend the board one card at a time so prefixes are shared
+        if len(runout) == missing:
+            showdown(state, runout)
+            return
+        for pos in range(start, len(remaining)):
+            runout.append(remaining[pos])
+            runouts(addCard(state, remaining[pos]), pos + 1, runout)
+            runout.pop()
+
+    state = addCards(EMPTY_STATE, board)
+    if first is None:
+        runouts(state, 0, [])
+    else:
+        runouts(addCard(state, remaining[first]), first + 1, [remaining[first]])
+    totals[4] += totals[0]
+    return totals
+
+
+def exact(hole, board=(), opponents=1, workers=None):
+    """
+    Compute the exact win/tie/lose probabilities of hole cards by enumerating every deal
+
+    :param hole: two cards (card objects or codes)
+    :param board: 0 ~ 5 known community cards
+    :param opponents: number of opponents with unknown cards
+    :param workers: number of worker processes (default: all cores, 1 runs in this process)
+    :return: Equity
+    """
+
+    hole, board = _checkCards(hole, board, opponents)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # One shard per first runout card
+    remaining = 50 - len(board)
+    missing = 5 - len(board)
+    shards = [None] if missing == 0 else list(range(remaining - missing + 1))
+
+    totals = [0, 0, 0, 0.0, 0.0]
+    start = time.perf_counter()
+    if workers <= 1 or len(shards) == 1:
+        results = [_enumerate(hole, board, opponents, shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            n = len(shards)
+            results = list(pool.map(_enumerate, [hole] * n, [board] * n, [opponents] * n, shards))
+    for result in results:
+        for i in range(5):
+            totals[i] += result[i]
+
+    return Equity(*totals, time.perf_counter() - start, exact=True)
+
+
+def equity(hole, board=(), opponents=1, method="auto", exactLimit=EXACT_LIMIT, **options):
+    """
+    Get the win/tie/lose probabilities of hole cards, exactly when few deals remain
+
+    :param hole: two cards (card objects or codes), e.g. Poker._playerCards
+    :param board: 0 ~ 5 known community cards, e.g. Poker._communityCards
+    :param opponents: number of opponents with unknown cards
+    :param method: "exact", "montecarlo" or "auto" (exact up to exactLimit deals)
+    :param exactLimit: largest number of deals "auto" enumerates
+    :param options: workers for both methods, and trials, confidence, timeBudget,
+                    seed and batchSize for Monte Carlo
+    :return: Equity
+    """
+
+    if method == "auto":
+        method = "exact" if deals(board, opponents) <= exactLimit else "montecarlo"
+
+    if method == "exact":
+        return exact(hole, board, opponents, options.get("workers"))
+    elif method == "montecarlo":
+        return monteCarlo(hole, board, opponents, **options)
+    raise ValueError("unknown equity method: " + str(method))
+
+
+def _simulate(hole, board, opponents, trials, seed, backend, path=None):
+    """
+    Run a batch of Monte Carlo trials (runs in a worker process)
+
+    :param hole: hero hole card codes
+    :param board: known board card codes
+    :param opponents: number of opponents
+    :param trials: number of trials
+    :param seed: seed of this batch's random stream
+    :param backend: evaluator backend name
+    :param path: lookup table file of the backend (see evaluator.getBackendPath)
+    :return: wins, ties, losses, sum of pot shares, sum of squared pot shares
+    """
+
+    if evaluator.getBackend()[0] != backend or evaluator.getBackendPath() != path:
+        evaluator.setBackend(backend, path)
+    evaluate = evaluator.getBackend()[1]
+
+    rng = random.Random(seed)
+    known = set(hole) | set(board)
+    remaining = [code for code in range(52) if code not in known]
+    missing = 5 - len(board)
+    need = missing + 2 * opponents
+    hole = list(hole)
+    board = list(board)
+
+    wins = ties = losses = 0
+    share = shareSquares = 0.0
+    for i in range(trials):
+        drawn = rng.sample(remaining, need)
+        fullBoard = board + drawn[:missing]
+        hero = evaluate(fullBoard + hole)
+
+        best = 0
+        tied = 0
+        for seat in range(missing, need, 2):
+            key = evaluate(fullBoard + drawn[seat:seat + 2])
+            if key > best:
+                best = key
+                tied = 1 if key == hero else 0
+            elif key == best and key == hero:
+                tied += 1
+
+        if hero > best:
+            wins += 1
+            share += 1.0
+            shareSquares += 1.0
+        elif hero == best:
+            ties += 1
+            part = 1.0 / (tied + 1)
+            share += part
+            shareSquares += part * part
+        else:
+            losses += 1
+
+    return wins, ties, losses, share, shareSquares
+
+
+def monteCarlo(hole, board=(), opponents=1, trials=None, confidence=None, timeBudget=None,
+               workers=None, seed=None, batchSize=BATCH_SIZE):
+    """
+    Estimate the win/tie/lose probabilities of hole cards with Monte Carlo trials
+
+    :param hole: two cards (card objects or codes), e.g. Poker._playerCards
+    :param board: 0 ~ 5 known community cards, e.g. Poker._communityCards
+    :param opponents: number of opponents with unknown cards
+    :param trials: maximum number of trials (default 100000 when nothing else limits the run)
+    :param confidence: stop once the 95% confidence half width of the equity is below this
+    :param timeBudget: stop submitting batches after this many seconds
+    :param workers: number of worker processes (default: all cores, 1 runs in this process)
+    :param seed: seed of the run (random when None)
+    :param batchSize: trials per batch
+    :return: Equity
+    """
+
+    hole, board = _checkCards(hole, board, opponents)
+    if trials is None and confidence is None and timeBudget is None:
+        trials = DEFAULT_TRIALS
+    if seed is None:
+        seed = random.getrandbits(64)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    backend = evaluator.getBackend()[0]
+    path = evaluator.getBackendPath()
+
+    totals = [0, 0, 0, 0.0, 0.0]
+    start = time.perf_counter()
+    batch = 0
+    submitted = 0
+
+    def done():
+        # Check every limit against the finished trials
+        if trials is not None and submitted >= trials:
+            return True
+        if timeBudget is not None and time.perf_counter() - start >= timeBudget:
+            return True
+        if confidence is not None and totals[0] + totals[1] + totals[2] >= batchSize:
+            return Equity(*totals, 1.0).margin <= confidence
+        return False
+
+    def nextSize():
+        if trials is None:
+            return batchSize
+        return min(batchSize, trials - submitted)
+
+    def add(result):
+        for i in range(5):
+            totals[i] += result[i]
+
+    if workers <= 1:
+        while not done():
+            size = nextSize()
+            add(_simulate(hole, board, opponents, size, batchSeed(seed, batch), backend, path))
+            batch += 1
+            submitted += size
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            pending = set()
+            while True:
+                # Keep every worker busy with a couple of batches
+                while not done() and len(pending) < 2 * workers:
+                    size = nextSize()
+                    pending.add(pool.submit(_simulate, hole, board, opponents, size, batchSeed(seed, batch),
+                                            backend, path))
+                    batch += 1
+                    submitted += size
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    add(future.result())
+
+    return Equity(*totals, time.perf_counter() - start)
@@ -0,0 +1,325 @@
+##
+# Bitmask hand evaluator
+#  Cards are evaluated as small integer codes (0 ~ 51, see core.py) folded into 13-bit rank
+#  masks in a single pass.  The result is one integer strength key: a bigger key
+#  always means a better hand, kickers included, so hands compare with ">".
+#
+#  Key layout: category << 20 | five 4-bit ranks (most significant first)
+#  Ranks go from 0 (deuce) to 12 (ace)
+
+# Hand categories (same numbering as poker.checkHand)
+HIGH_CARD = 1
+ONE_PAIR = 2
+TWO_PAIR = 3
+THREE_OF_A_KIND = 4
+STRAIGHT = 5
+FLUSH = 6
+FULL_HOUSE = 7
+FOUR_OF_A_KIND = 8
+STRAIGHT_FLUSH = 9
+ROYAL_FLUSH = 10
+
+CATEGORY_NAMES = ("", "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight",
+                  "Flush", "Full House", "Four of a Kind", "Straight Flush", "Royal Flush")
+
+
+def cardCode(card):
+    """
+    Get the integer code of a card
+
+    :param card: a card object or an int code
+    :return: int - card code (see core.py)
+    """
+
+    if isinstance(card, int):
+        return card
+    return card.getCode()
+
+
+def rankOf(code):
+    """
+    Get the ace-high rank of a card code
+
+    :param code: card code (0 ~ 51)
+    :return: int - 0 (deuce) ~ 12 (ace)
+    """
+
+    return (code % 13 + 12) % 13
+
+
+def rankValue(rank):
+    """
+    Convert an ace-high rank back to a card value
+
+    :param rank: 0 (deuce) ~ 12 (ace)
+    :return: int - card value (1 ~ 13)
+    """
+
+    return 1 if rank == 12 else rank + 2
+
+
+# Per-code lookups
+_RANK_BIT = [1 << rankOf(code) for code in range(52)]
+_SUIT = [code // 13 for code in range(52)]
+
+# Per-mask lookups (13-bit rank masks)
+_BITS = [bin(mask).count("1") for mask in range(8192)]
+_TOP = [tuple(rank for rank in range(12, -1, -1) if mask >> rank & 1) for mask in range(8192)]
+
+
+def _straightHigh(mask):
+    """
+    Find the highest straight in a rank mask
+
+    :param mask: 13-bit rank mask
+    :return: int - high rank + 1, or 0 if there is no straight
+    """
+
+    # Aces also play low
+    wide = mask << 1 | mask >> 12
+    for high in range(13, 3, -1):
+        if (wide >> (high - 4)) & 0b11111 == 0b11111:
+            return high
+    return 0
+
+
+_STRAIGHT = [_straightHigh(mask) for mask in range(8192)]
+
+
+def _key(category, ranks):
+    """
+    Pack a category and up to five ranks into a strength key
+
+    :param category: hand category (1 ~ 10)
+    :param ranks: ranks in order of significance
+    :return: int - strength key
+    """
+
+    key = category
+    for i in range(5):
+        key = key << 4 | (ranks[i] if i < len(ranks) else 0)
+    return key
+
+
+def evaluate(codes):
+    """
+    Evaluate a hand of card codes
+
+    :param codes: an iterable of card codes (usually 5 ~ 7)
+    :return: int - strength key, bigger is better
+    """
+
+    # One pass: rank masks by multiplicity and rank masks by suit
+    m1 = m2 = m3 = m4 = 0
+    suits = [0, 0, 0, 0]
+    for code in codes:
+        bit = _RANK_BIT[code]
+        suits[_SUIT[code]] |= bit
+        m4 |= m3 & bit
+        m3 |= m2 & bit
+        m2 |= m1 & bit
+        m1 |= bit
+
+    return _evaluateMasks(m1, m2, m3, m4, suits)
+
+
+def _evaluateMasks(m1, m2, m3, m4, suits):
+    """
+    Evaluate a hand from its rank masks
+
+    :param m1: ranks held at least once
+    :param m2: ranks held at least twice
+    :param m3: ranks held at least three times
+    :param m4: ranks held four times
+    :param suits: rank mask of every suit
+    :return: int - strength key
+    """
+
+    # Straight flush and royal flush
+    flushMask = 0
+    for mask in suits:
+        if _BITS[mask] >= 5:
+            flushMask = mask
+            high = _STRAIGHT[mask]
+            if high == 13:
+                return _key(ROYAL_FLUSH, (12,))
+            elif high:
+                return _key(STRAIGHT_FLUSH, (high - 1,))
+
+    # Four of a kind
+    if m4:
+        quad = _TOP[m4][0]
+        return _key(FOUR_OF_A_KIND, (quad,) + _TOP[m1 & ~(1 << quad)][:1])
+
+    # Full house
+    if m3:
+        trips = _TOP[m3][0]
+        pairs = m2 & ~(1 << trips)
+        if pairs:
+            return _key(FULL_HOUSE, (trips, _TOP[pairs][0]))
+
+    # Flush
+    if flushMask:
+        return _key(FLUSH, _TOP[flushMask][:5])
+
+    # Straight
+    high = _STRAIGHT[m1]
+    if high:
+        return _key(STRAIGHT, (high - 1,))
+
+    # Three of a kind
+    if m3:
+        trips = _TOP[m3][0]
+        return _key(THREE_OF_A_KIND, (trips,) + _TOP[m1 & ~(1 << trips)][:2])
+
+    # Two pairs and one pair
+    if m2:
+        pairs = _TOP[m2]
+        if len(pairs) >= 2:
+            rest = m1 & ~(1 << pairs[0] | 1 << pairs[1])
+            return _key(TWO_PAIR, pairs[:2] + _TOP[rest][:1])
+        return _key(ONE_PAIR, pairs[:1] + _TOP[m1 & ~(1 << pairs[0])][:3])
+
+    # Highest card
+    return _key(HIGH_CARD, _TOP[m1][:5])
+
+
+# Incremental evaluation
+#  A hand state is a tuple (m1, m2, m3, m4, spades, hearts, clubs, diamonds) of
+#  rank masks.  Shared cards (e.g. a board prefix) are added once and the state
+#  is extended card by card for every runout or hole card pair.
+EMPTY_STATE = (0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def addCard(state, code):
+    """
+    Add a card to a hand state
+
+    :param state: hand state tuple
+    :param code: card code
+    :return: new hand state tuple
+    """
+
+    m1, m2, m3, m4, s0, s1, s2, s3 = state
+    bit = _RANK_BIT[code]
+    suit = _SUIT[code]
+    return (m1 | bit, m2 | m1 & bit, m3 | m2 & bit, m4 | m3 & bit,
+            s0 | bit if suit == 0 else s0, s1 | bit if suit == 1 else s1,
+            s2 | bit if suit == 2 else s2, s3 | bit if suit == 3 else s3)
+
+
+def addCards(state, codes):
+    """
+    Add several cards to a hand state
+
+    :param state: hand state tuple
+    :param codes: iterable of card codes
+    :return: new hand state tuple
+    """
+
+    for code in codes:
+        state = addCard(state, code)
+    return state
+
+
+def finish(state):
+    """
+    Get the strength key of a hand state
+
+    :param state: hand state tuple
+    :return: int - strength key, same as evaluate on the same cards
+    """
+
+    return _evaluateMasks(state[0], state[1], state[2], state[3], state[4:])
+
+
+# Evaluator used by handStrength
+_backend = evaluate
+_backendName = "bitmask"
+_backendPath = None
+
+
+def setBackend(name, path=None):
+    """
+    Choose how handStrength evaluates hands
+
+    :param name: "bitmask" or "table" (memory-mapped lookup table, see lookup.py)
+    :param path: lookup table file, built when missing
+    """
+
+    global _backend, _backendName, _backendPath
+    if name == "bitmask":
+        _backend = evaluate
+        path = None
+    elif name == "table":
+        import lookup
+        path = path or lookup.DEFAULT_PATH
+        _backend = lookup.load(path).evaluate
+    else:
+        raise ValueError("unknown evaluator backend: " + str(name))
+    _backendName = name
+    _backendPath = path
+
+
+def getBackend():
+    """
+    Get the evaluator used by handStrength
+
+    :return: backend name and a function of a list of card codes to a strength key
+    """
+
+    return _backendName, _backend
+
+
+def getBackendPath():
+    """
+    Get the lookup table file of the evaluator used by handStrength
+
+    :return: table file, or None for backends without one
+    """
+
+    return _backendPath
+
+
+def handStrength(cards):
+    """
+    Get the strength key of a hand
+
+    :param cards: a list of cards or card codes
+    :return: int - strength key, bigger is better
+    """
+
+    return _backend([cardCode(card) for card in cards])
+
+
+def category(key):
+    """
+    Get the hand category of a strength key
+
+    :param key: strength key
+    :return: int - category (1 ~ 10)
+    """
+
+    return key >> 20
+
+
+def topRank(key):
+    """
+    Get the most significant rank of a strength key
+
+    :param key: strength key
+    :return: int - 0 (deuce) ~ 12 (ace)
+    """
+
+    return key >> 16 & 15
+
+
+def describe(key):
+    """
+    Describe a strength key
+
+    :param key: strength key
+    :return: string - category name
+    """
+
+    return CATEGORY_NAMES[category(key)]
@@ -0,0 +1,215 @@
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from evaluator import addCard, finish, EMPTY_STATE, CATEGORY_NAMES
+
+##
+# Exhaustive enumeration
+#  Walks every 5-card (2,598,960), 6-card (20,358,520) or 7-card
+#  (133,784,560) hand with one evaluator backend and counts the categories
+#  checkHand assigns.  The counts are checked against the known combinatorial
+#  frequencies, which proves the backend correct and measures its throughput.
+#  Work is sharded by the lowest card of the hand and spread across all cores.
+#
+#  python exhaustive.py --cards 5 7 --backend batch
+
+BACKENDS = ("bitmask", "table", "batch", "cascade")
+
+# Known number of hands of every category, high card (1) to royal flush (10)
+FREQUENCIES = {
+    5: [0, 1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 36, 4],
+    6: [0, 6612900, 9730740, 2532816, 732160, 361620, 205792, 165984, 14664, 1656, 188],
+    7: [0, 23294460, 58627800, 31433400, 6461620, 6180020, 4047644, 3473184, 224848, 37260, 4324],
+}
+
+
+def _bitmaskShard(size, first):
+    """
+    Count categories of every hand whose lowest card is first, extending hand states card by card
+
+    :param size: cards per hand
+    :param first: lowest card code
+    :return: list of 11 counts indexed by category
+    """
+
+    counts = [0] * 11
+
+    def walk(state, start, left):
+        if left == 0:
+            counts[finish(state) >> 20] += 1
+            return
+        for code in range(start, 53 - left):
+            walk(addCard(state, code), code + 1, left - 1)
+
+    walk(addCard(EMPTY_STATE, first), first + 1, size - 1)
+    return counts
+
+
+def _tableShard(size, first):
+    """
+    Count categories of every hand whose lowest card is first with the lookup table
+
+    :param size: cards per hand
+    :param first: lowest card code
+    :return: list of 11 counts indexed by category
+    """
+
+    import lookup
+    evaluate = lookup.load().evaluate
+    counts = [0] * 11
+    for rest in itertools.combinations(range(first + 1, 52), size - 1):
+        counts[evaluate((first,) + rest) >> 20] += 1
+    return counts
+
+
+def _cascadeShard(size, first):
+    """
+    Count categories of every hand whose lowest card is first with the rank cascade
+
+    :param size: cards per hand
+    :param first: lowest card code
+    :return: list of 11 counts indexed by category
+    """
+
+    from core import CARDS
+    from hands import cascadeHand
+    counts = [0] * 11
+    for rest in itertools.combinations(CARDS[first + 1:], size - 1):
+        counts[cascadeHand((CARDS[first],) + rest)[0]] += 1
+    return counts
+
+
+_colex = {}
+
+
+def _colexCombinations(n, k):
+    """
+    Get every k-subset of range(n) sorted by largest element first (colex order),
+    so the subsets of range(m) are the first comb(m, k) rows
+
+    :param n: number of items
+    :param k: subset size
+    :return: (comb(n, k), k) uint8 numpy array
+    """
+
+    import numpy as np
+    if (n, k) not in _colex:
+        rows = np.array(list(itertools.combinations(range(n), k)), np.uint8).reshape(-1, k)
+        order = np.lexsort(rows.T) if k else np.arange(len(rows))
+        _colex[(n, k)] = rows[order]
+    return _colex[(n, k)]
+
+
+def _batchShard(size, first):
+    """
+    Count categories of every hand whose lowest card is first with the NumPy batch evaluator
+
+    :param size: cards per hand
+    :param first: lowest card code
+    :return: list of 11 counts indexed by category
+    """
+
+    import numpy as np
+    from batch import evaluateBatch
+
+    counts = np.zeros(11, np.int64)
+    table = _colexCombinations(50, size - 2)
+    for second in range(first + 1, 52 - (size - 2)):
+        # Every hand starting with first and second, the rest above second
+        tails = table[:math.comb(51 - second, size - 2)] + np.uint8(second + 1)
+        hands = np.empty((len(tails), size), np.uint8)
+        hands[:, 0] = first
+        hands[:, 1] = second
+        hands[:, 2:] = tails
+        counts += np.bincount(evaluateBatch(hands) >> 20, minlength=11)
+    return counts.tolist()
+
+
+_SHARDS = {"bitmask": _bitmaskShard, "table": _tableShard, "batch": _batchShard, "cascade": _cascadeShard}
+
+
+def enumerateHands(size, backend="bitmask", workers=None, progress=None):
+    """
+    Count the categories of every hand of a size
+
+    :param size: cards per hand (5 ~ 7)
+    :param backend: "bitmask", "table", "batch" or "cascade"
+    :param workers: number of worker processes (default: all cores, 1 runs in this process)
+    :param progress: optional function called with (shards done, shard count)
+    :return: list of 11 counts indexed by category
+    """
+
+    if backend not in _SHARDS:
+        raise ValueError("unknown backend: " + str(backend))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if backend == "table":
+        # Build the table file once before the workers map it
+        import lookup
+        lookup.load().close()
+
+    shard = _SHARDS[backend]
+    firsts = list(range(52 - size + 1))
+    counts = [0] * 11
+
+    def add(result, done):
+        for cat in range(11):
+            counts[cat] += result[cat]
+        if progress is not None:
+            progress(done, len(firsts))
+
+    if workers <= 1:
+        for done, first in enumerate(firsts, 1):
+            add(shard(size, first), done)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = pool.map(shard, [size] * len(firsts), firsts)
+            for done, result in enumerate(results, 1):
+                add(result, done)
+    return counts
+
+
+def check(size, counts):
+    """
+    Compare category counts with the known frequencies
+
+    :param size: cards per hand (5 ~ 7)
+    :param counts: list of 11 counts indexed by category
+    :return: list of (category, counted, expected) that differ
+    """
+
+    expected = FREQUENCIES[size]
+    return [(cat, counts[cat], expected[cat]) for cat in range(1, 11) if counts[cat] != expected[cat]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count every 5- or 7-card hand by category")
+    parser.add_argument("--cards", type=int, nargs="+", default=[5], choices=(5, 6, 7))
+    parser.add_argument("--backend", default="bitmask", choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    ok = True
+    for size in args.cards:
+        start = time.perf_counter()
+        counts = enumerateHands(size, args.backend, args.workers)
+        elapsed = time.perf_counter() - start
+        total = sum(counts)
+
+        print(size, "cards,", args.backend, "backend:")
+        for cat in range(10, 0, -1):
+            mark = "" if counts[cat] == FREQUENCIES[size][cat] else "  expected " + str(FREQUENCIES[size][cat])
+            print("  {:16} {:>11,}{}".format(CATEGORY_NAMES[cat], counts[cat], mark))
+        print("  {:16} {:>11,} in {:.1f} s ({:,.0f} hands/s)".format("Total", total, elapsed, total / elapsed))
+        ok = ok and not check(size, counts)
+
+    print("OK" if ok else "MISMATCH")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
+import time
+START = time.perf_counter()
+
+import sys
 from poker import Poker
 
 
 def main():
+    # Play on a server table with --server host:port
+    engine = None
+    recorder = None
+    if "--server" in sys.argv:
+        from client import RemoteEngine
+        host, port = sys.argv[sys.argv.index("--server") + 1].rsplit(":", 1)
+        engine = RemoteEngine(host, int(port))
+
+    # Play against more AI seats with --seats 3..9, record every round with --history file
+    elif "--seats" in sys.argv or "--history" in sys.argv:
+        from ai import AIPlayer
+        from engine import PokerEngine
+        from history import HistoryWriter
+        BANK = 500
+        MIN_WAGE = 20
+        seats = int(sys.argv[sys.argv.index("--seats") + 1]) if "--seats" in sys.argv else 2
+        if "--history" in sys.argv:
+            recorder = HistoryWriter(sys.argv[sys.argv.index("--history") + 1], BANK, MIN_WAGE)
+        engine = PokerEngine(BANK, MIN_WAGE, AIPlayer(), recorder, seats=seats)
+
+    # Time the phases of every frame with --profile file (written at exit), --profile-overlay shows them
+    profiler = None
+    options = {}
+    if "--profile" in sys.argv or "--profile-overlay" in sys.argv:
+        from profiler import FrameProfiler
+        profiler = FrameProfiler()
+        options = {"profiler": profiler, "overlay": "--profile-overlay" in sys.argv}
+
     # Set up game
     WIDTH = 600
     HEIGHT = 400
-    game = Poker(WIDTH, HEIGHT)
+    game = Poker(WIDTH, HEIGHT, engine, startTime=START, startupReport="--startup-report" in sys.argv, **options)
 
     # Play game
-    game.run()
+    try:
+        game.run()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if "--profile" in sys.argv:
+            profiler.dump(sys.argv[sys.argv.index("--profile") + 1])
 
 
 if __name__ == "__main__":
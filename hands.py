@@ -0,0 +1,298 @@
+from evaluator import handStrength, category, topRank, rankValue, FLUSH, STRAIGHT_FLUSH, ROYAL_FLUSH
+
+
+def checkHand(cards):
+    """
+    check hand and return the ranking and highest card in the rank
+    rank 1 - 10 from single card to royal flush
+
+    :param cards: a list of cards
+    :return: rank and card
+    """
+
+    key = handStrength(cards)
+    rank = category(key)
+    value = rankValue(topRank(key))
+
+    # Flushes report a card of the flush suit
+    if rank in (FLUSH, STRAIGHT_FLUSH, ROYAL_FLUSH):
+        suits = [card.getSuit() for card in cards]
+        suit = max(suits, key=suits.count)
+        cards = [card for card in cards if card.getSuit() == suit]
+
+    for card in cards:
+        if card.getValue() == value:
+            return rank, card
+
+
+def cascadeHand(cards):
+    """
+    check hand one rank at a time (reference implementation of checkHand)
+    rank 1 - 10 from single card to royal flush
+
+    :param cards: a list of cards
+    :return: rank and card
+    """
+
+    # 10 - royal flush
+    card = royalFlush(cards)
+    if card is not None:
+        return 10, card
+
+    # 9 - straight flush
+    card = straightFlush(cards)
+    if card is not None:
+        return 9, card
+
+    # 8 - four of a kind
+    card = findRepeat(4, cards)
+    if card is not None:
+        return 8, card
+
+    # 7 - full house
+    card = fullHouse(cards)
+    if card is not None:
+        return 7, card
+
+    # 6 - flush
+    card = flush(cards)
+    if card is not None:
+        return 6, card
+
+    # 5 - straight
+    card = straight(cards)
+    if card is not None:
+        return 5, card
+
+    # 4 - three of a kind
+    card = findRepeat(3, cards)
+    if card is not None:
+        return 4, card
+
+    # 3 - two pairs
+    card = twoPair(cards)
+    if card is not None:
+        return 3, card
+
+    # 2 - one pair
+    card = findRepeat(2, cards)
+    if card is not None:
+        return 2, card
+
+    # 1 - highest card
+    card = findHighest(cards)
+    return 1, card
+
+
+def findHighest(cards):
+    """
+    Finds the highest card in the list
+
+    :param cards: a list of cards
+    :return: a card with the highest value
+    """
+
+    highest = 0
+    for i in range(1, len(cards)):
+        if cards[i] > cards[highest]:
+            highest = i
+
+    return cards[highest]
+
+
+def findRepeat(minimum, cards):
+    """
+    Find multiples of a same card
+
+    :param minimum: number of multiples to look for
+    :param cards: a list of cards
+    :return: one of the multiple cards if found
+    """
+    vals = []
+    for i in range(13):
+        vals.append([])
+
+    # Sort cards by value, ace at the end
+    for card in cards:
+        val = card.getValue()
+        if val == 1:
+            vals[12].append(card)
+        else:
+            vals[val - 2].append(card)
+
+    # Find highest value repeat:
+    for val in reversed(vals):
+        if len(val) >= minimum:
+            return val[0]
+
+    # Not enough repeats
+    return None
+
+
+def twoPair(cards):
+    """
+    Look for two pairs in the list
+
+    :param cards: a list of cards
+    :return: one of the cards of the highest pair
+    """
+
+    vals = []
+    for i in range(13):
+        vals.append([])
+
+    # Sort cards by value, ace at the end
+    for card in cards:
+        val = card.getValue()
+        if val == 1:
+            vals[12].append(card)
+        else:
+            vals[val - 2].append(card)
+
+    # Look for two pairs
+    for i in reversed(range(13)):
+        # First pair found
+        if len(vals[i]) >= 2:
+            temp = vals[i][0]
+            # Look for second pair
+            for j in reversed(range(i)):
+                if len(vals[j]) >= 2:
+                    return temp
+
+    # Does not have 2 pairs
+    return None
+
+
+def straight(cards):
+    """
+    Look for a straight in the list of cards
+
+    :param cards: a list of cards
+    :return: the highest value card in the straight if found
+    """
+
+    # Sort cards by value
+    sorted = []
+    for i in range(14):
+        sorted.append([])
+
+    for card in cards:
+        val = card.getValue()
+        sorted[val - 1].append(card)
+        # Add aces twice
+        if val == 1:
+            sorted[13].append(card)
+
+    # Check for five in a row
+    pos = 13
+    while pos >= 4:
+        temp = pos
+        for i in range(5):
+            # Not consecutive, update position
+            if len(sorted[pos - i]) == 0:
+                pos = pos - i - 1
+                break
+
+        # consecutive found
+        if temp == pos:
+            return sorted[pos][0]
+
+    return None
+
+
+def flush(cards):
+    """
+    Look of a flush in the list of cards
+
+    :param cards: a list of cards
+    :return: The highest value card in the flush
+    """
+
+    # Sort cards by suit
+    suits = [[], [], [], []]
+    for card in cards:
+        suit = card.getSuit()
+        if suit == "Spades":
+            suits[0].append(card)
+        elif suit == "Hearts":
+            suits[1].append(card)
+        elif suit == "Clubs":
+            suits[2].append(card)
+        elif suit == "Diamonds":
+            suits[3].append(card)
+
+    # Find 5 of the same suit
+    for suit in suits:
+        if len(suit) >= 5:
+            # Return the highest value suit card
+            return findHighest(suit)
+
+    # No flush
+    return None
+
+
+def fullHouse(cards):
+    """
+    Look for a full house in the list of cards
+
+    :param cards: a list of cards
+    :return: the highest card of the triplet in the full house
+    """
+    # Look for three of a kind
+    card = findRepeat(3, cards)
+    if card is None:
+        return None
+
+    # Look for a pair
+    newCards = []
+    for c in cards:
+        if c.getValue() != card.getValue():
+            newCards.append(c)
+    temp = findRepeat(2, newCards)
+
+    if temp is None:
+        return None
+    else:
+        return card
+
+
+def straightFlush(cards):
+    """
+    Look for a straight flush in the list of cards
+
+    :param cards: a list of cards
+    :return: the highest value card in the straight flush
+    """
+
+    # Check for the suit
+    card = flush(cards)
+    if card is None:
+        return None
+
+    # Sort out cards with the suit
+    suit = []
+    for c in cards:
+        if c.getSuit() == card.getSuit():
+            suit.append(c)
+
+    # Find straight and get highest value card
+    return straight(suit)
+
+
+def royalFlush(cards):
+    """
+    Look for a royal flush in the list of cards
+
+    :param cards: a list of cards
+    :return: return the ace  in the royal flush
+    """
+
+    # Check for straight flush
+    card = straightFlush(cards)
+    if card is None:
+        return None
+
+    if card.getValue() != 1:
+        return None
+    else:
+        return card
@@ -0,0 +1,181 @@
+from evaluator import addCard, finish, EMPTY_STATE, _BITS, _STRAIGHT
+
+##
+# Incremental hand state
+#  Follows a hand as its cards arrive, one at a time.  Adding a card updates
+#  the rank masks (ranks held at least once, twice, three and four times) and
+#  the four suit masks in O(1), so the strength of the hand so far and facts
+#  like draws are ready at every street without looking at the cards again.
+
+# Number of ranks that would complete a straight in a rank mask without one
+_OUTS = [0 if _STRAIGHT[mask] else sum(1 for rank in range(13) if _STRAIGHT[mask | 1 << rank])
+         for mask in range(8192)]
+
+
+##
+# HandState class
+#  the rank and suit masks of a growing hand
+class HandState:
+    __slots__ = ("_state", "_size", "_key")
+
+    def __init__(self, codes=()):
+        """
+        Start a hand
+
+        :param codes: card codes already in the hand
+        """
+
+        self._state = EMPTY_STATE
+        self._size = 0
+        self._key = None
+        for code in codes:
+            self.add(code)
+
+    def add(self, code):
+        """
+        Add a card to the hand
+
+        :param code: card code
+        """
+
+        self._state = addCard(self._state, code)
+        self._size += 1
+        self._key = None
+
+    def reset(self):
+        """
+        Empty the hand
+        """
+
+        self._state = EMPTY_STATE
+        self._size = 0
+        self._key = None
+
+    def copy(self):
+        """
+        Get an independent copy of the hand
+
+        :return: HandState
+        """
+
+        other = HandState()
+        other._state = self._state
+        other._size = self._size
+        other._key = self._key
+        return other
+
+    def state(self):
+        """
+        Get the evaluator state tuple (see evaluator.addCard)
+
+        :return: tuple of 4 rank masks and 4 suit masks
+        """
+
+        return self._state
+
+    def size(self):
+        """
+        Get the number of cards in the hand
+
+        :return: int - number of cards
+        """
+
+        return self._size
+
+    def strength(self):
+        """
+        Get the strength key of the best hand so far (computed once per card)
+
+        :return: int - strength key, bigger is better
+        """
+
+        if self._key is None:
+            self._key = finish(self._state)
+        return self._key
+
+    def category(self):
+        """
+        Get the category of the best hand so far
+
+        :return: int - evaluator.HIGH_CARD ~ evaluator.ROYAL_FLUSH
+        """
+
+        return self.strength() >> 20
+
+    def rankCount(self, rank):
+        """
+        Get how many cards of a rank the hand holds
+
+        :param rank: 0 (deuce) ~ 12 (ace)
+        :return: int - 0 ~ 4
+        """
+
+        m1, m2, m3, m4 = self._state[:4]
+        return (m1 >> rank & 1) + (m2 >> rank & 1) + (m3 >> rank & 1) + (m4 >> rank & 1)
+
+    def suitCount(self, suit):
+        """
+        Get how many cards of a suit the hand holds
+
+        :param suit: suit index (0 ~ 3, see core.SUITS)
+        :return: int - number of cards
+        """
+
+        return _BITS[self._state[4 + suit]]
+
+    def rankMask(self):
+        """
+        Get the ranks the hand holds
+
+        :return: int - 13-bit mask, bit 0 for deuces
+        """
+
+        return self._state[0]
+
+    def madeFlush(self):
+        """
+        Check if the hand holds five cards of a suit
+
+        :return: True or False
+        """
+
+        return max(_BITS[suit] for suit in self._state[4:]) >= 5
+
+    def madeStraight(self):
+        """
+        Check if the hand holds five ranks in a row
+
+        :return: True or False
+        """
+
+        return _STRAIGHT[self._state[0]] != 0
+
+    def flushDraw(self):
+        """
+        Check if the hand is one card away from a flush
+
+        :return: True or False
+        """
+
+        return max(_BITS[suit] for suit in self._state[4:]) == 4
+
+    def straightOuts(self):
+        """
+        Get the number of ranks that would complete a straight
+
+        :return: int - 0 with a straight made, 1 for a gutshot, 2 for an open-ended draw
+        """
+
+        return _OUTS[self._state[0]]
+
+    def straightDraw(self):
+        """
+        Check if the hand is one card away from a straight
+
+        :return: True or False
+        """
+
+        return _OUTS[self._state[0]] != 0
+
+    def __repr__(self):
+        return "HandState(size=" + str(self._size) + ", strength=" + hex(self.strength()) + ")"
@@ -0,0 +1,372 @@
+import mmap
+import os
+import struct
+import time
+from array import array
+
+##
+# Hand history
+#  A binary log of every round played, 64 bytes per hand:
+#
+#   file header  <8sHH4x   magic, version, record size
+#   hand record  kind (1), board (5), player cards (2), AI cards (2),
+#                result (1: win | shownDown << 2), action count (1),
+#                opcodes (8), amounts (8 x u32), ante (u32),
+#                bank delta (i32), pot (u32)
+#   session      kind (2), start time (f64), bank (u32), minimum wager (u32)
+#
+#  Cards are codes, 255 where no card was dealt.  A writer adds a session
+#  record every time it opens the file, so hand records are not at fixed
+#  positions: the sidecar file <history>.idx holds the offset of every hand
+#  record (u64) for seeking by hand index.  The writer appends in batches,
+#  data first and index second; a crash can only leave the index short or a
+#  record half written, and both are repaired the next time a writer opens
+#  the file.
+
+MAGIC = b"PKRHIST1"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sHH4x")
+RECORD = struct.Struct("<B5s2s2sBB8s8IIiI")
+SESSION = struct.Struct("<B3xdII44x")
+INDEX = struct.Struct("<Q")
+
+HAND = 1
+SESSION_START = 2
+
+NO_CARD = 255
+MAX_ACTIONS = 8
+BATCH_SIZE = 1024
+
+# Opcodes; the AI flag marks the AI seat's actions
+CHECK = 1
+CALL = 2
+RAISE = 3  # after calling any bet
+FOLD = 4
+AI = 0x80
+
+
+def indexPath(path):
+    """
+    Get the path of a history's offset index
+
+    :param path: history file
+    :return: string - index file
+    """
+
+    return path + ".idx"
+
+
+def _cards(codes, size):
+    """
+    Pack card codes into bytes
+
+    :param codes: list of card codes
+    :param size: number of bytes
+    :return: bytes, padded with NO_CARD
+    """
+
+    return bytes(codes) + bytes([NO_CARD]) * (size - len(codes))
+
+
+def _codes(data):
+    """
+    Unpack card codes from bytes
+
+    :param data: bytes padded with NO_CARD
+    :return: list of card codes
+    """
+
+    return [code for code in data if code != NO_CARD]
+
+
+##
+# HandRecord class
+#  one round of the game
+class HandRecord:
+    __slots__ = ("board", "playerCards", "AICards", "actions", "win", "shownDown", "ante", "bankDelta", "pot")
+
+    def __init__(self, board, playerCards, AICards, actions, win, shownDown, ante, bankDelta, pot):
+        """
+        Describe a round
+
+        :param board: community card codes
+        :param playerCards: the player's hole card codes
+        :param AICards: the AI's hole card codes
+        :param actions: list of (opcode, amount)
+        :param win: engine.LOST, WON or DRAW
+        :param shownDown: True if the round ended with a showdown
+        :param ante: wager paid at the start of the round
+        :param bankDelta: chips the player won (or lost, negative) in the round
+        :param pot: chips in the pot when the round ended
+        """
+
+        self.board = board
+        self.playerCards = playerCards
+        self.AICards = AICards
+        self.actions = actions
+        self.win = win
+        self.shownDown = shownDown
+        self.ante = ante
+        self.bankDelta = bankDelta
+        self.pot = pot
+
+    def pack(self):
+        """
+        Encode the record
+
+        :return: bytes - RECORD.size bytes
+        """
+
+        if len(self.actions) > MAX_ACTIONS:
+            raise ValueError("more than " + str(MAX_ACTIONS) + " actions in a hand")
+        opcodes = bytes(op for op, amount in self.actions)
+        amounts = [amount for op, amount in self.actions] + [0] * (MAX_ACTIONS - len(self.actions))
+        return RECORD.pack(HAND, _cards(self.board, 5), _cards(self.playerCards, 2), _cards(self.AICards, 2),
+                           self.win | self.shownDown << 2, len(self.actions), opcodes, *amounts,
+                           self.ante, self.bankDelta, self.pot)
+
+    @classmethod
+    def unpack(cls, buffer, offset=0):
+        """
+        Decode a record
+
+        :param buffer: bytes-like object
+        :param offset: position of the record
+        :return: HandRecord
+        """
+
+        fields = RECORD.unpack_from(buffer, offset)
+        count = fields[5]
+        actions = list(zip(fields[6][:count], fields[7:7 + count]))
+        return cls(_codes(fields[1]), _codes(fields[2]), _codes(fields[3]), actions,
+                   fields[4] & 3, bool(fields[4] & 4), fields[15], fields[16], fields[17])
+
+    def __eq__(self, other):
+        return isinstance(other, HandRecord) and all(getattr(self, name) == getattr(other, name)
+                                                     for name in self.__slots__)
+
+    def __repr__(self):
+        return "HandRecord(board=" + str(self.board) + ", player=" + str(self.playerCards) + ", AI=" + \
+               str(self.AICards) + ", win=" + str(self.win) + ", bankDelta=" + str(self.bankDelta) + ")"
+
+
+def repair(path):
+    """
+    Bring a history and its index up to date after a crash: drop a half written
+    record and index the hand records the index is missing
+
+    :param path: history file
+    :return: int - number of hand records
+    """
+
+    with open(path, "r+b") as file:
+        header = file.read(FILE_HEADER.size)
+        magic, version, size = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError("not a hand history: " + path)
+
+        # Drop a half written record
+        end = file.seek(0, os.SEEK_END)
+        whole = FILE_HEADER.size + (end - FILE_HEADER.size) // RECORD.size * RECORD.size
+        if whole != end:
+            file.truncate(whole)
+
+        with open(indexPath(path), "a+b") as index:
+            # Drop a half written offset and offsets past the data
+            count = index.seek(0, os.SEEK_END) // INDEX.size
+            index.truncate(count * INDEX.size)
+            start = FILE_HEADER.size
+            while count:
+                index.seek((count - 1) * INDEX.size)
+                last = INDEX.unpack(index.read(INDEX.size))[0]
+                if last < whole:
+                    start = last + RECORD.size
+                    break
+                count -= 1
+            index.truncate(count * INDEX.size)
+            index.seek(0, os.SEEK_END)
+
+            # Index the records after the last indexed one
+            file.seek(start)
+            offsets = array("Q")
+            while start < whole:
+                if file.read(RECORD.size)[0] == HAND:
+                    offsets.append(start)
+                start += RECORD.size
+            index.write(offsets.tobytes())
+            return count + len(offsets)
+
+
+##
+# HistoryWriter class
+#  appends hand records in batches
+class HistoryWriter:
+    def __init__(self, path, bank=0, minWage=0, batchSize=BATCH_SIZE):
+        """
+        Open (or create) a history and start a session
+
+        :param path: history file
+        :param bank: the player's chips at the start of the session
+        :param minWage: wager paid at the start of every round
+        :param batchSize: records buffered before they are written
+        """
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as file:
+                file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD.size))
+            open(indexPath(path), "wb").close()
+        self._count = repair(path)
+
+        self._file = open(path, "ab")
+        self._index = open(indexPath(path), "ab")
+        self._offset = self._file.tell()
+        self._batchSize = batchSize
+        self._buffer = bytearray()
+        self._offsets = array("Q")
+
+        self._buffer += SESSION.pack(SESSION_START, time.time(), bank, minWage)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, hand):
+        """
+        Add a hand (written once the batch is full)
+
+        :param hand: HandRecord
+        """
+
+        self._offsets.append(self._offset + len(self._buffer))
+        self._buffer += hand.pack()
+        self._count += 1
+        if len(self._offsets) >= self._batchSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered records and their offsets
+        """
+
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._offset += len(self._buffer)
+            self._buffer = bytearray()
+        if self._offsets:
+            self._index.write(self._offsets.tobytes())
+            self._index.flush()
+            self._offsets = array("Q")
+
+    def close(self):
+        """
+        Write what is buffered and close the files
+        """
+
+        self.flush()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+##
+# HistoryReader class
+#  memory maps a history and its index
+class HistoryReader:
+    def __init__(self, path):
+        """
+        Open a history for reading
+
+        :param path: history file
+        """
+
+        if not os.path.exists(indexPath(path)):
+            repair(path)
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = FILE_HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError("not a hand history: " + path)
+
+        self._indexFile = open(indexPath(path), "rb")
+        if os.path.getsize(indexPath(path)):
+            self._indexData = mmap.mmap(self._indexFile.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = memoryview(self._indexData).cast("Q")
+        else:
+            self._indexData = None
+            self._offsets = memoryview(b"").cast("Q")
+        # Ignore offsets of records a writer has not finished
+        self._count = len(self._offsets)
+        while self._count and self._offsets[self._count - 1] + RECORD.size > len(self._data):
+            self._count -= 1
+
+    def __len__(self):
+        return self._count
+
+    def offset(self, index):
+        """
+        Get the position of a hand record in the file
+
+        :param index: hand index
+        :return: int - byte offset
+        """
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("hand index out of range")
+        return self._offsets[index]
+
+    def __getitem__(self, index):
+        return HandRecord.unpack(self._data, self.offset(index))
+
+    def hands(self, start=0, stop=None):
+        """
+        Generate hands in order, starting anywhere
+
+        :param start: index of the first hand
+        :param stop: index after the last hand (all hands by default)
+        :return: generator of HandRecord
+        """
+
+        if stop is None or stop > self._count:
+            stop = self._count
+        for index in range(start, stop):
+            yield HandRecord.unpack(self._data, self._offsets[index])
+
+    def __iter__(self):
+        return self.hands()
+
+    def sessions(self):
+        """
+        Generate the sessions of the history by scanning it
+
+        :return: generator of (start time, bank, minimum wager)
+        """
+
+        for offset in range(FILE_HEADER.size, len(self._data) - RECORD.size + 1, RECORD.size):
+            if self._data[offset] == SESSION_START:
+                kind, started, bank, minWage = SESSION.unpack_from(self._data, offset)
+                yield started, bank, minWage
+
+    def close(self):
+        """
+        Unmap and close the files
+        """
+
+        self._offsets.release()
+        if self._indexData is not None:
+            self._indexData.close()
+        self._indexFile.close()
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,298 @@
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from core import CARDS
+from evaluator import evaluate, rankOf, FLUSH
+from hands import cascadeHand
+
+##
+# Lookup table evaluator
+#  A chained-state table over card codes.  Every card moves a rank state (the
+#  multiset of ranks seen so far) and a suit state (the count of every suit)
+#  one step; the final rank state holds the strength key.  Flushes are looked
+#  up separately by the 13-bit rank mask of the flush suit.  With 7 cards or
+#  less a flush excludes four of a kind and full house, so the two tables
+#  never disagree.
+#
+#  The tables are written once to a binary file and memory-mapped, so every
+#  process evaluating hands shares the same pages.
+
+MAGIC = b"PKRLUT\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")
+MAX_CARDS = 7
+NO_FLUSH = 4
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "handranks.dat")
+
+
+def _rankStates():
+    """
+    Enumerate every multiset of up to 7 ranks (at most 4 of each)
+
+    :return: list of rank count tuples and dictionary of tuple to state index
+    """
+
+    states = [(0,) * 13]
+    index = {states[0]: 0}
+    pos = 0
+    while pos < len(states):
+        counts = states[pos]
+        pos += 1
+        if sum(counts) == MAX_CARDS:
+            continue
+        for rank in range(13):
+            if counts[rank] < 4:
+                nxt = counts[:rank] + (counts[rank] + 1,) + counts[rank + 1:]
+                if nxt not in index:
+                    index[nxt] = len(states)
+                    states.append(nxt)
+    return states, index
+
+
+def _suitStates():
+    """
+    Enumerate every suit count of up to 7 cards
+
+    :return: list of suit count tuples and dictionary of tuple to state index
+    """
+
+    states = [(0, 0, 0, 0)]
+    index = {states[0]: 0}
+    pos = 0
+    while pos < len(states):
+        counts = states[pos]
+        pos += 1
+        if sum(counts) == MAX_CARDS:
+            continue
+        for suit in range(4):
+            nxt = counts[:suit] + (counts[suit] + 1,) + counts[suit + 1:]
+            if nxt not in index:
+                index[nxt] = len(states)
+                states.append(nxt)
+    return states, index
+
+
+def _noFlushValue(counts):
+    """
+    Evaluate a rank multiset with suits spread so no flush is possible
+
+    :param counts: tuple of 13 rank counts (ace-high order)
+    :return: int - strength key
+    """
+
+    codes = []
+    suit = 0
+    for rank, count in enumerate(counts):
+        value = 1 if rank == 12 else rank + 2
+        for i in range(count):
+            codes.append(suit % 4 * 13 + value - 1)
+            suit += 1
+    return evaluate(codes)
+
+
+def generate():
+    """
+    Generate the lookup tables
+
+    :return: dictionary of table name to array of unsigned ints
+    """
+
+    rankStates, rankIndex = _rankStates()
+    suitStates, suitIndex = _suitStates()
+
+    # Rank chain, indexes are pre-multiplied by 13
+    rankNext = array("I", bytes(4 * 13 * len(rankStates)))
+    rankValue = array("I", bytes(4 * len(rankStates)))
+    for state, counts in enumerate(rankStates):
+        rankValue[state] = _noFlushValue(counts)
+        if sum(counts) == MAX_CARDS:
+            continue
+        for rank in range(13):
+            if counts[rank] < 4:
+                nxt = counts[:rank] + (counts[rank] + 1,) + counts[rank + 1:]
+                rankNext[state * 13 + rank] = rankIndex[nxt] * 13
+
+    # Suit chain, indexes are pre-multiplied by 4
+    suitNext = array("I", bytes(4 * 4 * len(suitStates)))
+    suitFlush = array("I", [NO_FLUSH] * len(suitStates))
+    for state, counts in enumerate(suitStates):
+        for suit in range(4):
+            if counts[suit] >= 5:
+                suitFlush[state] = suit
+        if sum(counts) == MAX_CARDS:
+            continue
+        for suit in range(4):
+            nxt = counts[:suit] + (counts[suit] + 1,) + counts[suit + 1:]
+            suitNext[state * 4 + suit] = suitIndex[nxt] * 4
+
+    # Flush table by rank mask of the flush suit
+    flush = array("I", bytes(4 * 8192))
+    for mask in range(8192):
+        if bin(mask).count("1") >= 5:
+            flush[mask] = evaluate([(rank + 1) % 13 for rank in range(13) if mask >> rank & 1])
+
+    return {"rankNext": rankNext, "rankValue": rankValue,
+            "suitNext": suitNext, "suitFlush": suitFlush, "flush": flush}
+
+
+def build(path=DEFAULT_PATH):
+    """
+    Generate the lookup tables and write them to a binary file
+
+    :param path: file to write
+    """
+
+    tables = generate()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(tables["rankValue"]), len(tables["suitFlush"])))
+        for name in ("rankNext", "rankValue", "suitNext", "suitFlush", "flush"):
+            table = tables[name]
+            if sys.byteorder != "little":
+                table = array("I", table)
+                table.byteswap()
+            table.tofile(file)
+    # Replace atomically so running processes never see a partial file
+    os.replace(tmp, path)
+
+
+def load(path=DEFAULT_PATH, rebuild=True):
+    """
+    Memory-map the lookup tables, building the file when it is missing or stale
+
+    :param path: table file
+    :param rebuild: build the file if it is missing or has another version
+    :return: LookupTable
+    """
+
+    if rebuild:
+        try:
+            with open(path, "rb") as file:
+                magic, version, rankStates, suitStates = HEADER.unpack(file.read(HEADER.size))
+            stale = magic != MAGIC or version != VERSION
+        except (OSError, struct.error):
+            stale = True
+        if stale:
+            build(path)
+
+    return LookupTable(path)
+
+
+##
+# LookupTable class
+#  evaluates hands from memory-mapped lookup tables
+class LookupTable:
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Map the table file into memory
+
+        :param path: table file written by build()
+        """
+
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, rankStates, suitStates = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a version " + str(VERSION) + " lookup table: " + path)
+        if sys.byteorder != "little":
+            raise ValueError("lookup tables need a little-endian machine")
+
+        view = memoryview(self._map)[HEADER.size:].cast("I")
+        pos = 0
+        sizes = (("_rankNext", 13 * rankStates), ("_rankValue", rankStates),
+                 ("_suitNext", 4 * suitStates), ("_suitFlush", suitStates), ("_flush", 8192))
+        for name, size in sizes:
+            setattr(self, name, view[pos:pos + size])
+            pos += size
+
+        # Column of every card code in the two chains
+        self._rankCol = [rankOf(code) for code in range(52)]
+        self._suitCol = [code // 13 for code in range(52)]
+        self._rankBit = [1 << rankOf(code) for code in range(52)]
+
+    def evaluate(self, codes):
+        """
+        Evaluate a hand of up to 7 card codes
+
+        :param codes: a list of card codes
+        :return: int - strength key, same as evaluator.evaluate
+        """
+
+        rankNext = self._rankNext
+        suitNext = self._suitNext
+        rankCol = self._rankCol
+        suitCol = self._suitCol
+
+        rank = suit = 0
+        for code in codes:
+            rank = rankNext[rank + rankCol[code]]
+            suit = suitNext[suit + suitCol[code]]
+
+        flushSuit = self._suitFlush[suit // 4]
+        if flushSuit == NO_FLUSH:
+            return self._rankValue[rank // 13]
+
+        # Flushes are rare, look up the ranks of the flush suit
+        mask = 0
+        for code in codes:
+            if suitCol[code] == flushSuit:
+                mask |= self._rankBit[code]
+        return self._flush[mask]
+
+    def close(self):
+        """
+        Release the memory map
+        """
+
+        for name in ("_rankNext", "_rankValue", "_suitNext", "_suitFlush", "_flush"):
+            getattr(self, name).release()
+        self._map.close()
+
+
+def verify(table, trials=100000, seed=0):
+    """
+    Check the lookup table against the bitmask evaluator and the rank cascade
+
+    :param table: a LookupTable
+    :param trials: number of random hands of every size (5, 6 and 7 cards)
+    :param seed: random seed
+    :return: list of mismatching code lists (empty if the table is correct)
+    """
+
+    rng = random.Random(seed)
+    deck = list(range(52))
+    mismatches = []
+    for size in (5, 6, 7):
+        for i in range(trials):
+            codes = rng.sample(deck, size)
+            key = table.evaluate(codes)
+            if key != evaluate(codes):
+                mismatches.append(codes)
+            elif key >> 20 != cascadeHand([CARDS[code] for code in codes])[0]:
+                mismatches.append(codes)
+
+    # Every flush pattern, which random hands rarely reach
+    for mask in range(8192):
+        if bin(mask).count("1") >= 5:
+            codes = [13 + (rank + 1) % 13 for rank in range(13) if mask >> rank & 1][:MAX_CARDS]
+            if table.evaluate(codes) != evaluate(codes) or evaluate(codes) >> 20 < FLUSH:
+                mismatches.append(codes)
+
+    return mismatches
+
+
+def main():
+    # Build the table and check it
+    table = load()
+    mismatches = verify(table)
+    print("Lookup table:", DEFAULT_PATH)
+    print("Mismatches:", len(mismatches))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,279 +1,19 @@
+import time
 import pygame
+from card import clearImages
 from deck import Deck
 from text import Button, Text, InputBox
+from hands import checkHand
+from showdown import compareHands
+from engine import PokerEngine
+from ai import AIPlayer, RAISE
+from render import DirtyRenderer
+from profiler import NULL_PROFILER
 
-
-def checkHand(cards):
-    """
-    check hand and return the ranking and highest card in the rank
-    rank 1 - 10 from single card to royal flush
-
-    :param cards: a list of cards
-    :return: rank and card
-    """
-
-    # 10 - royal flush
-    card = royalFlush(cards)
-    if card is not None:
-        return 10, card
-
-    # 9 - straight flush
-    card = straightFlush(cards)
-    if card is not None:
-        return 9, card
-
-    # 8 - four of a kind
-    card = findRepeat(4, cards)
-    if card is not None:
-        return 8, card
-
-    # 7 - full house
-    card = fullHouse(cards)
-    if card is not None:
-        return 7, card
-
-    # 6 - flush
-    card = flush(cards)
-    if card is not None:
-        return 6, card
-
-    # 5 - straight
-    card = straight(cards)
-    if card is not None:
-        return 5, card
-
-    # 4 - three of a kind
-    card = findRepeat(3, cards)
-    if card is not None:
-        return 4, card
-
-    # 3 - two pairs
-    card = twoPair(cards)
-    if card is not None:
-        return 3, card
-
-    # 2 - one pair
-    card = findRepeat(2, cards)
-    if card is not None:
-        return 2, card
-
-    # 1 - highest card
-    card = findHighest(cards)
-    return 1, card
-
-
-def findHighest(cards):
-    """
-    Finds the highest card in the list
-
-    :param cards: a list of cards
-    :return: a card with the highest value
-    """
-
-    highest = 0
-    for i in range(1, len(cards)):
-        if cards[i] > cards[highest]:
-            highest = i
-
-    return cards[highest]
-
-
-def findRepeat(minimum, cards):
-    """
-    Find multiples of a same card
-
-    :param minimum: number of multiples to look for
-    :param cards: a list of cards
-    :return: one of the multiple cards if found
-    """
-    vals = []
-    for i in range(13):
-        vals.append([])
-
-    # Sort cards by value, ace at the end
-    for card in cards:
-        val = card.getValue()
-        if val == 1:
-            vals[12].append(card)
-        else:
-            vals[val - 2].append(card)
-
-    # Find highest value repeat:
-    for val in reversed(vals):
-        if len(val) >= minimum:
-            return val[0]
-
-    # Not enough repeats
-    return None
-
-
-def twoPair(cards):
-    """
-    Look for two pairs in the list
-
-    :param cards: a list of cards
-    :return: one of the cards of the highest pair
-    """
-
-    vals = []
-    for i in range(13):
-        vals.append([])
-
-    # Sort cards by value, ace at the end
-    for card in cards:
-        val = card.getValue()
-        if val == 1:
-            vals[12].append(card)
-        else:
-            vals[val - 2].append(card)
-
-    # Look for two pairs
-    for i in reversed(range(13)):
-        # First pair found
-        if len(vals[i]) >= 2:
-            temp = vals[i][0]
-            # Look for second pair
-            for j in reversed(range(i)):
-                if len(vals[j]) >= 2:
-                    return temp
-
-    # Does not have 2 pairs
-    return None
-
-
-def straight(cards):
-    """
-    Look for a straight in the list of cards
-
-    :param cards: a list of cards
-    :return: the highest value card in the straight if found
-    """
-
-    # Sort cards by value
-    sorted = []
-    for i in range(14):
-        sorted.append([])
-
-    for card in cards:
-        val = card.getValue()
-        sorted[val - 1].append(card)
-        # Add aces twice
-        if val == 1:
-            sorted[13].append(card)
-
-    # Check for five in a row
-    pos = 13
-    while pos >= 4:
-        temp = pos
-        for i in range(5):
-            # Not consecutive, update position
-            if len(sorted[pos - i]) == 0:
-                pos = pos - i - 1
-                break
-
-        # consecutive found
-        if temp == pos:
-            return sorted[pos][0]
-
-    return None
-
-
-def flush(cards):
-    """
-    Look of a flush in the list of cards
-
-    :param cards: a list of cards
-    :return: The highest value card in the flush
-    """
-
-    # Sort cards by suit
-    suits = [[], [], [], []]
-    for card in cards:
-        suit = card.getSuit()
-        if suit == "Spades":
-            suits[0].append(card)
-        elif suit == "Hearts":
-            suits[1].append(card)
-        elif suit == "Clubs":
-            suits[2].append(card)
-        elif suit == "Diamonds":
-            suits[3].append(card)
-
-    # Find 5 of the same suit
-    for suit in suits:
-        if len(suit) >= 5:
-            # Return the highest value suit card
-            return findHighest(suit)
-
-    # No flush
-    return None
-
-
-def fullHouse(cards):
-    """
-    Look for a full house in the list of cards
-
-    :param cards: a list of cards
-    :return: the highest card of the triplet in the full house
-    """
-    # Look for three of a kind
-    card = findRepeat(3, cards)
-    if card is None:
-        return None
-
-    # Look for a pair
-    newCards = []
-    for c in cards:
-        if c.getValue() != card.getValue():
-            newCards.append(c)
-    temp = findRepeat(2, newCards)
-
-    if temp is None:
-        return None
-    else:
-        return card
-
-
-def straightFlush(cards):
-    """
-    Look for a straight flush in the list of cards
-
-    :param cards: a list of cards
-    :return: the highest value card in the straight flush
-    """
-
-    # Check for the suit
-    card = flush(cards)
-    if card is None:
-        return None
-
-    # Sort out cards with the suit
-    suit = []
-    for c in cards:
-        if c.getSuit() == card.getSuit():
-            suit.append(c)
-
-    # Find straight and get highest value card
-    return straight(suit)
-
-
-def royalFlush(cards):
-    """
-    Look for a royal flush in the list of cards
-
-    :param cards: a list of cards
-    :return: return the ace  in the royal flush
-    """
-
-    # Check for straight flush
-    card = straightFlush(cards)
-    if card is None:
-        return None
-
-    if card.getValue() != 1:
-        return None
-    else:
-        return card
+# Events after which SDL does not repaint the window (the pygame 2 window events where available)
+REDRAW_EVENTS = tuple(getattr(pygame, name) for name in
+                      ("VIDEOEXPOSE", "VIDEORESIZE", "WINDOWEXPOSED", "WINDOWRESTORED", "WINDOWSIZECHANGED")
+                      if hasattr(pygame, name))
 
 
 def test():
@@ -323,43 +63,63 @@ def test():
     print("Player best card:", card1)
     print("AI hand rank:", rank2)
     print("AI best card:", card2)
+    print("Winner:", {1: "Player", 0: "Tie", -1: "AI"}[compareHands(cards1, cards2)])
 
 
 ##
 # Poker class
-#  sets up and runs the poker game
+#  sets up and runs the poker game (a pygame view over engine.PokerEngine)
 class Poker:
-    def __init__(self, width, height):
+    def __init__(self, width, height, engine=None, startTime=None, startupReport=False,
+                 profiler=NULL_PROFILER, overlay=False):
         """
         Set up pygame with given dimensions and initialize instance variables
 
         :param width: Width of the pygame window
         :param height: Length of the pygame window
+        :param engine: game rules to render (a new PokerEngine by default)
+        :param startTime: time.perf_counter() at process start (defaults to now)
+        :param startupReport: print the startup report after the first frame
+        :param profiler: profiler.FrameProfiler timing the phases of every frame (off by default)
+        :param overlay: show the profiler's frame times on the window
         """
 
-        # Set up pygame
-        pygame.init()
+        # Startup milestones, in seconds since startTime
+        self._startTime = time.perf_counter() if startTime is None else startTime
+        self._startup = []
+        self._startupReport = startupReport
+        self.mark("init")
+
+        # Set up pygame (only the display, fonts start on first use)
+        pygame.display.init()
         self._width = width
         self._height = height
         self._display = pygame.display.set_mode((self._width, self._height))
+        # Images converted for an earlier display do not match this one
+        clearImages()
+        self.mark("display")
         self._clock = pygame.time.Clock()
         self._framesPerSecond = 30
+        self._profiler = profiler
+        self._profiler.setFrameRate(self._framesPerSecond)
+        self._idleTimeout = 1000  # ms to wait for an event when nothing animates
         self._sprites = pygame.sprite.LayeredUpdates()
         self._ticks = 1
         pygame.key.set_repeat(1, 120)
         self._waitTime = 15
+        GREEN = (53, 101, 77)
+        self._renderer = DirtyRenderer(self._display, GREEN)
+
+        # Set up game rules (with an AI opponent that decides)
+        self._engine = engine if engine is not None else PokerEngine(ai=AIPlayer())
 
-        # Set up cards
-        self._deck = Deck()
-        self._deck.setDefault()
-        self._deck.shuffle()
-        self._communityCards = Deck()
-        self._playerCards = Deck()
-        self._AICards = Deck()
+        # Set up card sprites, indexed by card code
+        self._cards = Deck()
+        self._cards.setDefault()
         self._cardBacks = Deck()
 
         # Card info
-        card = self._deck[0]
+        card = self._cards[0]
         cardWidth = card.getWidth()
         cardHeight = card.getHeight()
 
@@ -378,18 +138,32 @@ class Poker:
         self._playerCardPos.append((x, y))
         self._playerCardPos.append((x + cardWidth, y))
 
-        # Set up AI card positions
-        self._AICardPos = []
+        # Set up AI card positions, one pair per AI seat side by side
+        # (overlapping when they do not fit)
+        self._AICardPos = {}
+        seats = self._engine.seats()
+        span = cardWidth * 2 + 10  # from one seat to the next
+        step = cardWidth  # from a seat's first card to its second
+        if span * (seats - 1) > self._width - 10:
+            span = (self._width - 10 - cardWidth) // (seats - 1)
+            step = span // 2
+        tempX = (self._width - span * (seats - 2) - cardWidth - step) // 2
         y = self._height // 4 - cardHeight
-        self._AICardPos.append((x, y))
-        self._AICardPos.append((x + cardWidth, y))
+        for seat in range(1, seats):
+            x = tempX + span * (seat - 1)
+            self._AICardPos[seat] = [(x, y), (x + step, y)]
 
         # Set up Card back positions
-        self._cardBacks.add(self._deck.getCardBack(), self._AICardPos[0])
-        self._cardBacks.add(self._deck.getCardBack(), self._AICardPos[1])
+        self._AICardBacks = {}
+        for seat in range(1, seats):
+            self._AICardBacks[seat] = []
+            for position in self._AICardPos[seat]:
+                self._cardBacks.add(self._cards.getCardBack(), position)
+                self._AICardBacks[seat].append(self._cardBacks[self._cardBacks.size() - 1])
+        self.mark("cards")
 
         # 0 - title screen, 1 - setup screen, 2 - playing screen, 3 - round over screen
-        self._gameState = 0
+        self._gameState = self._engine.state()
 
         # Set up buttons and input box
         x = self._width // 2
@@ -410,11 +184,13 @@ class Poker:
         y += 2 * (self._raiseButton.rect().h + pad)
         self._foldButton = Button(self._display, "Fold", (x, y))
 
-        # Wage settings
-        self._minWage = 20
-        self._bank = 500
-        self._pot = 0
-        self._win = 0  # 0 - lost, 1 - win, 2 - draw
+        # Wage settings (mirrored from the engine)
+        self._minWage = self._engine.minWage()
+        self._bank = self._engine.bank()
+        self._pot = self._engine.pot()
+        self._win = self._engine.win()  # 0 - lost, 1 - win, 2 - draw
+        self._toCall = 0
+        self._AIActions = {}
 
         # Set up text
         x = (self._width - cardWidth * 5) // 5
@@ -433,6 +209,39 @@ class Poker:
         x = self._width - 5
         self._potText = Text(self._display, "Pot: " + str(self._pot), (x, y), "bottomright")
 
+        # Last action of every AI seat, under its cards
+        self._AITexts = {}
+        fontSize = 16 if step == cardWidth else 11
+        for seat in range(1, seats):
+            x = (self._AICardPos[seat][0][0] + self._AICardPos[seat][1][0] + cardWidth) // 2
+            y = self._AICardPos[seat][0][1] + cardHeight + 12
+            self._AITexts[seat] = Text(self._display, "AI checks", (x, y), "center", fontSize)
+
+        # Profiler overlay in the top right corner, refreshed every second of frames
+        self._overlay = None
+        if overlay and profiler.enabled:
+            self._overlay = Text(self._display, profiler.overlay(), (self._width - 2, 2), "topright", 12,
+                                 backColor=(255, 255, 255))
+        self.mark("texts")
+
+    def mark(self, name):
+        """
+        Record a startup milestone
+
+        :param name: milestone name
+        """
+
+        self._startup.append((name, time.perf_counter() - self._startTime))
+
+    def startupReport(self):
+        """
+        Get the startup milestones
+
+        :return: dictionary of milestone name to milliseconds since process start
+        """
+
+        return {name: round(seconds * 1000, 1) for name, seconds in self._startup}
+
     def mouseButtonDown(self, x, y):
         """
         Update game state when a button on the screen is pressed
@@ -443,120 +252,75 @@ class Poker:
 
         # Start game
         if self._gameState == 0 and self._playButton.rect().collidepoint(x, y):
-            # Update game state to setup
-            self._gameState = 1
+            self._engine.start()
             self._ticks = 1
-
-            # Update bank and pot
-            self.wage(self._minWage)
         # One of three buttons are pressed during a round
         elif self._gameState == 2:
-            # Fold and end round
             if self._foldButton.rect().collidepoint(x, y):
-                self._pot = 0
-                self._potText.setText("Pot: 0")
-                # Round over
-                self._gameState = 3
+                self._engine.fold()
             elif self._checkButton.rect().collidepoint(x, y):
-                # Update 4th or 5th community card
-                if self._communityCards.size() < 5:
-                    card = self._deck.draw()
-                    pos = self._communityCardPos[self._communityCards.size()]
-                    self._communityCards.add(card, pos)
-
-                    self.add(card)
+                self._engine.check()
             elif self._raiseButton.rect().collidepoint(x, y):
-                # Update pot if raised
-                if self._raiseButton.rect().collidepoint(x, y):
-                    wage = self._input.text()
-                    # Validate input
-                    if wage != "" and wage.isnumeric() and int(wage) <= self._bank:
-                        self.wage(int(wage))
-                        # Update 4th or 5th community card
-                        if self._communityCards.size() < 5:
-                            card = self._deck.draw()
-                            pos = self._communityCardPos[self._communityCards.size()]
-                            self._communityCards.add(card, pos)
-
-                            self.add(card)
-            # All community cards displayed
-            if self._communityCards.size() == 5:
-                # Show AI cards
-                # remove card back sprites (not necessary)
-                self._cardBacks[0].kill()
-                self._cardBacks[1].kill()
-                # Show cards
-                self.add(self._AICards[0])
-                self.add(self._AICards[1])
-
-                # Determine winner and update bank
-                playerScore, playerCard = checkHand((self._playerCards + self._communityCards).cards())
-                AIScore, AICard = checkHand((self._AICards + self._communityCards).cards())
-
-                self._win = 0
-                # Win
-                if playerScore > AIScore:
-                    self._bank += self._pot
-                    self._win = 1
-                elif playerScore == AIScore:
-                    # Same rank, win with better card
-                    if playerCard > AICard:
-                        self._bank += self._pot
-                        self._win = 1
-                    elif playerCard == AICard:
-                        # Exact same cards, win with better hand
-                        playerHand = findHighest(self._playerCards.cards())
-                        AIHand = findHighest(self._AICards.cards())
-                        if playerHand > AIHand:
-                            self._bank += self._pot
-                            self._win = 1
-                        # Draw
-                        elif playerHand.eq(AIHand):
-                            self._bank += self._pot // 2
-                            self._win = 2
-                # Update bank info
-                self._bankText.setText("Bank: " + str(self._bank))
-
-                # Change game state to round over
-                self._gameState = 3
+                wage = self._input.text()
+                # Validate input
+                if wage != "" and wage.isnumeric():
+                    self._engine.raiseBet(int(wage))
         # Bet again when a round is over
         elif self._gameState == 3 and self._replayButton.rect().collidepoint(x, y):
-            # Out of chips
-            if self._bank <= self._minWage:
-                return
-            # Restart game, back to setup mode
-            self._gameState = 1
-            self._ticks = 1
-            self._pot = 0
-            # Update bank and pot
-            self.wage(self._minWage)
-            # Return cards to deck
-            self._deck.merge(self._communityCards)
-            self._deck.merge(self._playerCards)
-            self._deck.merge(self._AICards)
-            # Shuffle deck
-            self._deck.shuffle()
-            # Empty other piles
-            self._communityCards.empty()
-            self._playerCards.empty()
-            self._AICards.empty()
-            # Clear sprites
-            self._sprites.empty()
-
-    def wage(self, wage):
-        """
-        Update the pot and bank with given wage and update their texts
+            if self._engine.rebet():
+                self._ticks = 1
 
-        :param wage: a wager that is <= to the bank
+        self.sync()
+
+    def sync(self):
+        """
+        Update sprites and texts from the engine state
         """
 
-        # Only wage if player have enough bank
-        if self._bank >= wage:
-            self._pot += 2 * wage
-            self._bank -= wage
+        engine = self._engine
+        self._gameState = engine.state()
+        self._win = engine.win()
+
+        # Update bank and pot texts
+        if engine.pot() != self._pot:
+            self._pot = engine.pot()
             self._potText.setText("Pot: " + str(self._pot))
+        if engine.bank() != self._bank:
+            self._bank = engine.bank()
             self._bankText.setText("Bank: " + str(self._bank))
 
+        # Update the check button and the AI's action
+        if engine.toCall() != self._toCall:
+            self._toCall = engine.toCall()
+            self._checkButton.setText("Call " + str(self._toCall) if self._toCall else "Check")
+        for seat in self._AITexts:
+            if engine.AIAction(seat) != self._AIActions.get(seat):
+                self._AIActions[seat] = engine.AIAction(seat)
+                if self._AIActions[seat] is not None:
+                    action, amount = self._AIActions[seat]
+                    self._AITexts[seat].setText("AI " + action + "s" + (" " + str(amount) if action == RAISE else ""))
+
+        # Place dealt cards
+        self._sprites.empty()
+        for pile, positions in ((engine.communityCards(), self._communityCardPos),
+                                (engine.playerCards(), self._playerCardPos)):
+            for i, code in enumerate(pile):
+                card = self._cards[code]
+                card.move(*positions[i])
+                self.add(card)
+
+        # AI cards stay hidden under card backs until the showdown, folded seats show none
+        for seat in self._AICardPos:
+            if not engine.inHand(seat):
+                continue
+            for i, code in enumerate(engine.seatCards(seat)):
+                if engine.shownDown():
+                    card = self._cards[code]
+                    card.move(*self._AICardPos[seat][i])
+                    self.add(card)
+                else:
+                    self.add(self._AICardBacks[seat][i])
+
     def update(self):
         """
         Update sprites and cards on the screen
@@ -564,47 +328,59 @@ class Poker:
 
         # Deal initial cards during the setup phase
         if self._gameState == 1 and self._ticks % self._waitTime == 0:
-            # Draw card
-            card = self._deck.draw()
+            self._engine.dealNext()
+            self.sync()
 
-            # Add cards to the middle
-            if self._communityCards.size() < 3:
-                # Add card at coordinate
-                pos = self._communityCardPos[self._communityCards.size()]
-                self._communityCards.add(card, pos)
+        # Update all sprites
+        self._sprites.update()
 
-                # Add sprite
-                self.add(card)
-            # Add player cards
-            elif self._playerCards.size() < 2:
-                # Add card at coordinate
-                pos = self._playerCardPos[self._playerCards.size()]
-                self._playerCards.add(card, pos)
+    def draw(self):
+        """
+        Display the buttons, texts and sprites that changed on the pygame window
+        """
 
-                # Add sprite
-                self.add(card)
-            # Add AI cards
+        items = []
+
+        # Show buttons & input box
+        if self._gameState == 0:
+            items.append(self._playButton)
+        elif self._gameState == 2:
+            items += [self._checkButton, self._raiseButton, self._foldButton, self._input]
+        elif self._gameState == 3:
+            items.append(self._replayButton)
+
+        # Show texts
+        items += [self._wagerText, self._bankText, self._potText]
+        if self._gameState in (2, 3):
+            items += [self._AITexts[seat] for seat in self._AITexts if self._AIActions.get(seat) is not None]
+        if self._gameState == 3:
+            if self._win == 0:
+                items.append(self._loseMessage)
+            elif self._win == 1:
+                items.append(self._winMessage)
             else:
-                # Add card at coordinate
-                pos = self._AICardPos[self._AICards.size()]
-                self._AICards.add(card, pos)
+                items.append(self._drawMessage)
+        if self._overlay is not None:
+            if self._ticks % self._framesPerSecond == 0:
+                self._overlay.setText(self._profiler.overlay())
+            items.append(self._overlay)
 
-                # Add card back sprite as placeholder
-                self.add(self._cardBacks[self._AICards.size() - 1])
+        texts = [(item, item.appearance(), item.area(), item.draw) for item in items]
 
-        # Update state to playing
-        if self._gameState == 1 and self._deck.size() <= 45:
-            self._gameState = 2
+        # Show sprites
+        sprites = [(sprite, sprite.image, sprite.rect, self._blitter(sprite)) for sprite in self._sprites]
 
-        # Update all sprites
-        self._sprites.update()
+        self._renderer.render([("text", texts), ("sprites", sprites)], self._profiler)
 
-    def draw(self):
+    def _blitter(self, sprite):
         """
-        Display all sprites on the pygame window
+        Get a function that draws a sprite on the pygame window
+
+        :param sprite: A sprite object
+        :return: function without arguments
         """
 
-        self._sprites.draw(self._display)
+        return lambda: self._display.blit(sprite.image, sprite.rect)
 
     def add(self, sprite):
         """
@@ -615,6 +391,32 @@ class Poker:
 
         self._sprites.add(sprite)
 
+    def animating(self):
+        """
+        Check if frames have to run at the full frame rate: while dealing or
+        while the input box takes keyboard inputs
+
+        :return: True or False
+        """
+
+        return self._gameState == 1 or (self._gameState == 2 and self._input.active())
+
+    def getEvents(self):
+        """
+        Get pending events, blocking until one arrives (or the idle timeout
+        passes) when nothing animates
+
+        :return: a list of pygame events
+        """
+
+        if self.animating():
+            return pygame.event.get()
+
+        event = pygame.event.wait(self._idleTimeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
     def quit(self):
         """
         Quit the pygame window
@@ -632,46 +434,39 @@ class Poker:
         # exit(1)
 
         # Run game
+        profiler = self._profiler
         while True:
-            # Get events
-            for event in pygame.event.get():
+            # Get events (sleeps until the next one when idle, which is not timed)
+            events = self.getEvents()
+            profiler.start()
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.quit()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.mouseButtonDown(event.pos[0], event.pos[1])
+                elif event.type in REDRAW_EVENTS:
+                    # The window lost its pixels: push the whole frame again
+                    self._renderer.invalidate()
 
                 if self._gameState == 2:
                     self._input.event(event)
+            profiler.lap("events")
 
             # Update everything
             self.update()
-            GREEN = (53, 101, 77)
-            self._display.fill(GREEN)
-
-            # Show buttons & input box
-            if self._gameState == 0:
-                self._playButton.draw()
-            elif self._gameState == 2:
-                self._checkButton.draw()
-                self._raiseButton.draw()
-                self._foldButton.draw()
-                self._input.draw()
-            elif self._gameState == 3:
-                self._replayButton.draw()
-
-            # Show texts
-            self._wagerText.draw()
-            self._bankText.draw()
-            self._potText.draw()
-            if self._gameState == 3:
-                if self._win == 0:
-                    self._loseMessage.draw()
-                elif self._win == 1:
-                    self._winMessage.draw()
-                else:
-                    self._drawMessage.draw()
-
+            profiler.lap("update")
             self.draw()
-            pygame.display.update()
-            self._clock.tick(self._framesPerSecond)
+            profiler.end()
+
+            # Time to first frame
+            if self._startup[-1][0] != "first frame":
+                self.mark("first frame")
+                if self._startupReport:
+                    print("Startup (ms):", self.startupReport())
+
+            # Keep the frame rate only while something moves
+            if self.animating():
+                self._clock.tick(self._framesPerSecond)
+            else:
+                self._clock.tick()
             self._ticks += 1
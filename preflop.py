@@ -0,0 +1,454 @@
+import argparse
+import itertools
+import os
+import struct
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from evaluator import cardCode, rankOf
+from rng import split, numpyStream
+
+##
+# Preflop tables
+#  The 1326 starting hands fall into 169 classes: 13 pairs, 78 suited and 78
+#  offsuit rank combinations.  A class index is high * 13 + low for suited
+#  hands, low * 13 + high for offsuit hands and rank * 14 for pairs (ranks
+#  ace-high, 0 = deuce), i.e. a cell of the usual 13 x 13 grid.
+#
+#  Tables are generated once and saved as float32 arrays with a header
+#  holding a version and a CRC-32 of the values:
+#   - vsRandom(): equity of every class against a random hand (169 values),
+#     shipped as preflop_random.dat so the game never builds it at startup;
+#     400000 trials per class put every value within about +-0.08% (one
+#     standard error), well under the gaps between the weakest classes
+#   - matrix(): heads-up equity of every class against every class (169 x 169
+#     values, row against column), averaged over the suit combinations of the
+#     two classes that do not share a card; too slow to build on demand, so
+#     it is generated with the command below and matrix() raises without it
+#
+#  python preflop.py --trials 20000      (Monte Carlo, about +-0.7%)
+#  python preflop.py --exact             (every board, hours even on many cores)
+#  python preflop.py --random            (the vs-random table, minutes per core)
+
+VERSION = 1
+HEADER = struct.Struct("<8sHHII")  # magic, version, reserved, count, crc32
+RANDOM_MAGIC = b"PKRPFRND"
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+RANDOM_PATH = os.path.join(DIRECTORY, "preflop_random.dat")
+RANDOM_TRIALS = 400000
+RANDOM_CHUNK = 1 << 15  # trials dealt at a time
+
+MATRIX_MAGIC = b"PKRPFMTX"
+MATRIX_PATH = os.path.join(DIRECTORY, "preflop_matrix.dat")
+MATRIX_TRIALS = 20000
+
+RANKS = "23456789TJQKA"
+
+
+def handClass(first, second):
+    """
+    Get the class of two hole cards
+
+    :param first: a card object or code
+    :param second: a card object or code
+    :return: int - class index (0 ~ 168)
+    """
+
+    first = cardCode(first)
+    second = cardCode(second)
+    high = rankOf(first)
+    low = rankOf(second)
+    if low > high:
+        high, low = low, high
+    if first // 13 == second // 13:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def className(index):
+    """
+    Get the usual name of a class, e.g. "AKs", "T9o" or "77"
+
+    :param index: class index
+    :return: string
+    """
+
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return RANKS[row] + RANKS[col] + "s"
+    return RANKS[col] + RANKS[row] + "o"
+
+
+_classHands = None
+
+
+def classHands(index):
+    """
+    Get every pair of hole card codes of a class
+
+    :param index: class index
+    :return: list of (code, code) - 6 for pairs, 4 suited, 12 offsuit
+    """
+
+    global _classHands
+    if _classHands is None:
+        _classHands = [[] for i in range(169)]
+        for a in range(52):
+            for b in range(a + 1, 52):
+                _classHands[handClass(a, b)].append((a, b))
+    return list(_classHands[index])
+
+
+def classSize(index):
+    """
+    Get the number of hole card combinations of a class
+
+    :param index: class index
+    :return: int - 6, 4 or 12
+    """
+
+    row, col = divmod(index, 13)
+    return 6 if row == col else 4 if row > col else 12
+
+
+def save(path, magic, values):
+    """
+    Save a table of floats with a version and checksum
+
+    :param path: file to write
+    :param magic: 8-byte table type
+    :param values: sequence of floats
+    """
+
+    data = array("f", values).tobytes()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(HEADER.pack(magic, VERSION, 0, len(values), zlib.crc32(data)))
+        file.write(data)
+    os.replace(tmp, path)
+
+
+def load(path, magic, count):
+    """
+    Load a table saved by save()
+
+    :param path: table file
+    :param magic: expected 8-byte table type
+    :param count: expected number of values
+    :return: array of floats, or None if the file is missing, stale or corrupt
+    """
+
+    try:
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            data = file.read()
+    except OSError:
+        return None
+    if len(header) != HEADER.size:
+        return None
+    fileMagic, version, reserved, fileCount, crc = HEADER.unpack(header)
+    if fileMagic != magic or version != VERSION or fileCount != count or len(data) != 4 * count:
+        return None
+    if zlib.crc32(data) != crc:
+        return None
+    values = array("f")
+    values.frombytes(data)
+    return values
+
+
+def _classVsRandom(index, trials, seed):
+    """
+    Estimate the heads-up equity of one class against a random hand
+
+    :param index: class index
+    :param trials: Monte Carlo trials
+    :param seed: random seed
+    :return: float - equity (0 ~ 1)
+    """
+
+    import numpy as np
+
+    # Suits do not matter against a random hand: one hand of the class stands for all
+    rng = numpyStream(seed)
+    hole = np.array(classHands(index)[0], np.intp)
+    wins = 0.0
+    for start in range(0, trials, RANDOM_CHUNK):
+        size = min(RANDOM_CHUNK, trials - start)
+        # The 7 cards with the lowest random keys, in key order: opponent's 2, then the board
+        keys = rng.random((size, 52))
+        keys[:, hole] = 2.0
+        dealt = np.argpartition(keys, 7, axis=1)[:, :7]
+        dealt = np.take_along_axis(dealt, np.argsort(np.take_along_axis(keys, dealt, 1), 1), 1)
+        combos = np.empty((size, 4), np.uint8)
+        combos[:, :2] = hole
+        combos[:, 2:] = dealt[:, :2]
+        wins += _showdowns(combos, dealt[:, 2:].astype(np.uint8))
+    return wins / trials
+
+
+def generateVsRandom(trials=RANDOM_TRIALS, workers=None, seed=0):
+    """
+    Estimate the heads-up equity of every class against a random hand, one class per task
+
+    :param trials: Monte Carlo trials per class
+    :param workers: worker processes (all cores by default)
+    :param seed: random seed
+    :return: list of 169 equities (0 ~ 1)
+    """
+
+    seeds = split(seed, 169)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return [_classVsRandom(index, trials, seeds[index]) for index in range(169)]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_classVsRandom, range(169), [trials] * 169, seeds))
+
+
+_vsRandom = None
+
+
+def vsRandom(path=RANDOM_PATH):
+    """
+    Get the equity table against a random hand, generating and saving it the first time
+
+    :param path: table file
+    :return: array of 169 equities indexed by class
+    """
+
+    global _vsRandom
+    if _vsRandom is None:
+        _vsRandom = load(path, RANDOM_MAGIC, 169)
+        if _vsRandom is None:
+            save(path, RANDOM_MAGIC, generateVsRandom())
+            _vsRandom = load(path, RANDOM_MAGIC, 169)
+    return _vsRandom
+
+
+def _combos(first, second):
+    """
+    Get every pair of hole cards of two classes that do not share a card
+
+    :param first: class index of the first hand
+    :param second: class index of the second hand
+    :return: (K, 4) uint8 numpy array - first hand, then second hand
+    """
+
+    import numpy as np
+
+    return np.array([a + b for a in classHands(first) for b in classHands(second) if not set(a) & set(b)],
+                    np.uint8).reshape(-1, 4)
+
+
+def _canonical(combo):
+    """
+    Get the same representative for every suit relabelling of two hands
+
+    :param combo: codes of the first hand, then the second hand
+    :return: tuple of 4 codes
+    """
+
+    best = None
+    for suits in itertools.permutations(range(4)):
+        codes = [suits[code // 13] * 13 + code % 13 for code in combo]
+        key = tuple(sorted(codes[:2]) + sorted(codes[2:]))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def _showdowns(combos, boards):
+    """
+    Score heads-up showdowns
+
+    :param combos: (N, 4) uint8 array of hole cards
+    :param boards: (N, 5) uint8 array of boards
+    :return: float - wins of the first hand, ties counted as half
+    """
+
+    import numpy as np
+    from batch import evaluateBatch
+
+    hands = np.empty((len(combos), 2, 7), np.uint8)
+    hands[:, 0, :2] = combos[:, :2]
+    hands[:, 1, :2] = combos[:, 2:]
+    hands[:, :, 2:] = boards[:, None, :]
+    keys = evaluateBatch(hands.reshape(-1, 7)).reshape(-1, 2)
+    return np.count_nonzero(keys[:, 0] > keys[:, 1]) + np.count_nonzero(keys[:, 0] == keys[:, 1]) / 2
+
+
+def _sampledEquity(first, second, trials, rng):
+    """
+    Estimate the equity of one class against another with random hands and boards
+
+    :param first: class index of the first hand
+    :param second: class index of the second hand
+    :param trials: number of showdowns
+    :param rng: numpy random generator
+    :return: float - equity of the first hand (0 ~ 1)
+    """
+
+    import numpy as np
+
+    combos = _combos(first, second)
+    combos = combos[rng.integers(len(combos), size=trials)]
+    # Board: the 5 dealt cards with the lowest random keys, hole cards excluded
+    keys = rng.random((trials, 52))
+    keys[np.arange(trials)[:, None], combos] = 2.0
+    boards = np.argpartition(keys, 5, axis=1)[:, :5].astype(np.uint8)
+    return _showdowns(combos, boards) / trials
+
+
+def _exactEquity(first, second):
+    """
+    Compute the equity of one class against another over every board
+
+    :param first: class index of the first hand
+    :param second: class index of the second hand
+    :return: float - equity of the first hand (0 ~ 1)
+    """
+
+    import numpy as np
+    from exhaustive import _colexCombinations
+
+    # Suit relabellings of the same hands have the same equity
+    weights = {}
+    for combo in _combos(first, second).tolist():
+        key = _canonical(combo)
+        weights[key] = weights.get(key, 0) + 1
+
+    boards = _colexCombinations(48, 5)
+    total = 0.0
+    for combo, weight in weights.items():
+        rest = np.array([code for code in range(52) if code not in combo], np.uint8)
+        combos = np.broadcast_to(np.array(combo, np.uint8), (len(boards), 4))
+        total += weight * _showdowns(combos, rest[boards]) / len(boards)
+    return total / sum(weights.values())
+
+
+def _matrixRow(first, trials, seed):
+    """
+    Compute the equities of one class against every later class
+
+    :param first: class index of the row
+    :param trials: showdowns per pair of classes, None for every board
+    :param seed: random seed
+    :return: list of equities against classes first + 1 ~ 168
+    """
+
+    if trials is None:
+        return [_exactEquity(first, second) for second in range(first + 1, 169)]
+    generator = numpyStream(seed, first)
+    return [_sampledEquity(first, second, trials, generator) for second in range(first + 1, 169)]
+
+
+def generateMatrix(trials=MATRIX_TRIALS, workers=None, seed=0, progress=None):
+    """
+    Compute the heads-up equity of every class against every class, one row per task
+
+    :param trials: showdowns per pair of classes, None for every board (exact)
+    :param workers: worker processes (all cores by default)
+    :param seed: random seed
+    :param progress: optional function called with the number of finished rows
+    :return: list of 169 * 169 equities, row class against column class
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    values = [0.5] * (169 * 169)
+
+    def add(first, row):
+        # The column class wins whatever the row class does not
+        for second, value in enumerate(row, first + 1):
+            values[first * 169 + second] = value
+            values[second * 169 + first] = 1 - value
+
+    # Row 0 is the longest, so no worker is left with a long row at the end
+    rows = list(range(168))
+    if workers <= 1:
+        for done, first in enumerate(rows, 1):
+            add(first, _matrixRow(first, trials, seed))
+            if progress:
+                progress(done)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = pool.map(_matrixRow, rows, [trials] * len(rows), [seed] * len(rows))
+            for done, (first, row) in enumerate(zip(rows, results), 1):
+                add(first, row)
+                if progress:
+                    progress(done)
+    return values
+
+
+_matrix = None
+
+
+def matrix(path=MATRIX_PATH):
+    """
+    Get the heads-up equity matrix (generated beforehand with python preflop.py)
+
+    :param path: table file
+    :return: array of 169 * 169 equities, row class against column class
+    """
+
+    global _matrix
+    if _matrix is None:
+        # Generating takes long (about 40 minutes per core), so never as a side effect of a lookup
+        _matrix = load(path, MATRIX_MAGIC, 169 * 169)
+        if _matrix is None:
+            raise FileNotFoundError("no valid preflop matrix at " + path + ", generate it with: python preflop.py")
+    return _matrix
+
+
+def headsUp(hole, other):
+    """
+    Get the preflop equity of hole cards against other hole cards
+
+    :param hole: two cards (objects or codes)
+    :param other: the opponent's two cards (objects or codes)
+    :return: float - equity of hole (0 ~ 1), ties counted as half
+    :raise FileNotFoundError: when the matrix has not been generated (see matrix)
+    """
+
+    return (_matrix or matrix())[handClass(*hole) * 169 + handClass(*other)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the preflop equity matrix")
+    parser.add_argument("--trials", type=int, default=MATRIX_TRIALS, help="showdowns per pair of classes")
+    parser.add_argument("--exact", action="store_true", help="evaluate every board instead of sampling")
+    parser.add_argument("--random", action="store_true", help="generate the vs-random table instead")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.random:
+        out = args.out or RANDOM_PATH
+        values = generateVsRandom(RANDOM_TRIALS, args.workers, args.seed)
+        save(out, RANDOM_MAGIC, values)
+        print("Saved", out, "in", round(time.perf_counter() - start), "s")
+        for name in ("AA", "AKs", "72o", "32o"):
+            print(name, round(values[[index for index in range(169) if className(index) == name][0]], 4))
+        return
+    args.out = args.out or MATRIX_PATH
+
+    def progress(done):
+        print("\r" + str(done) + "/168 rows", round(time.perf_counter() - start), "s", end="", flush=True)
+
+    values = generateMatrix(None if args.exact else args.trials, args.workers, args.seed, progress)
+    save(args.out, MATRIX_MAGIC, values)
+    print("\nSaved", args.out)
+    for first, second in (("AA", "KK"), ("AKs", "QQ"), ("AKo", "22"), ("72o", "AA")):
+        row = [index for index in range(169) if className(index) == first][0]
+        col = [index for index in range(169) if className(index) == second][0]
+        print(first, "vs", second, round(values[row * 169 + col], 4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import json
+import time
+from collections import deque
+
+##
+# Frame profiler
+#  Times the phases of every frame of Poker.run with time.perf_counter: the
+#  loop calls start() once the frame's events are in, lap(name) after every
+#  phase and end() when the frame is on screen.  Each lap is one clock read
+#  and one append; the percentiles are only sorted out when asked for.  A
+#  frame with nothing to redraw ends after its dirty lap, so the drawing
+#  phases count only the frames that drew.
+#
+#   events    handling the frame's events (not the wait for them)
+#   update    game state and sprites
+#   dirty     finding the changed areas and restoring their background
+#   text      drawing buttons, texts and the input box
+#   sprites   drawing cards
+#   display   pygame.display.update
+#
+#  The last WINDOW frames feed the rolling p50/p95/p99; every frame counts in
+#  a histogram of 1 ms buckets and, if it took longer than a frame at the
+#  target frame rate, as a missed deadline.  NULL_PROFILER has the same
+#  methods doing nothing, so the game loop costs a few empty calls per frame
+#  when profiling is off.
+
+PHASES = ("events", "update", "dirty", "text", "sprites", "display")
+WINDOW = 600  # frames in the rolling percentiles
+BUCKETS = 100  # 1 ms histogram buckets, the last one holds every slower frame
+
+
+def percentile(ordered, fraction):
+    """
+    Get a percentile of sorted values (nearest rank)
+
+    :param ordered: sorted list of values
+    :param fraction: 0 ~ 1, e.g. 0.95
+    :return: value, or 0 when there are none
+    """
+
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(values):
+    """
+    Summarize frame or phase times
+
+    :param values: times in seconds
+    :return: dictionary of p50, p95, p99 and max in ms
+    """
+
+    ordered = sorted(values)
+    return {"p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0}
+
+
+##
+# FrameProfiler class
+#  per-phase frame times of the game loop
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, framesPerSecond=30, window=WINDOW):
+        """
+        Set up an empty profile
+
+        :param framesPerSecond: target frame rate, which sets the frame deadline
+        :param window: number of recent frames in the rolling percentiles
+        """
+
+        self._deadline = 1 / framesPerSecond
+        self._frames = deque(maxlen=window)
+        self._phases = {name: deque(maxlen=window) for name in PHASES}
+        self._histogram = [0] * BUCKETS
+        self._count = 0
+        self._missed = 0
+        self._start = 0
+        self._last = 0
+
+    def setFrameRate(self, framesPerSecond):
+        """
+        Change the target frame rate
+
+        :param framesPerSecond: frames per second
+        """
+
+        self._deadline = 1 / framesPerSecond
+
+    def start(self):
+        """
+        Start timing a frame
+        """
+
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, name):
+        """
+        End a phase of the frame
+
+        :param name: phase name (see PHASES)
+        """
+
+        now = time.perf_counter()
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = deque(maxlen=self._frames.maxlen)
+        phase.append(now - self._last)
+        self._last = now
+
+    def end(self):
+        """
+        End the frame
+        """
+
+        elapsed = time.perf_counter() - self._start
+        self._frames.append(elapsed)
+        self._histogram[min(int(elapsed * 1000), BUCKETS - 1)] += 1
+        self._count += 1
+        if elapsed > self._deadline:
+            self._missed += 1
+
+    def frames(self):
+        """
+        Get the number of frames timed
+
+        :return: int - frames
+        """
+
+        return self._count
+
+    def missed(self):
+        """
+        Get the number of frames that took longer than a frame at the target rate
+
+        :return: int - frames
+        """
+
+        return self._missed
+
+    def stats(self):
+        """
+        Summarize the profile
+
+        :return: dictionary of frames, missed deadlines, the rolling frame and
+                 phase percentiles (ms) and the histogram of every frame
+        """
+
+        return {"frames": self._count,
+                "missed": self._missed,
+                "deadline": round(self._deadline * 1000, 3),
+                "frame": _summary(self._frames),
+                "phases": {name: _summary(times) for name, times in self._phases.items()},
+                "histogram": list(self._histogram)}
+
+    def overlay(self):
+        """
+        Get a one line summary for the screen
+
+        :return: string - rolling frame percentiles and missed deadlines
+        """
+
+        frame = _summary(self._frames)
+        return "frame p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} ms".format(**frame) + \
+               ", missed " + str(self._missed) + "/" + str(self._count)
+
+    def dump(self, path):
+        """
+        Write the profile to a JSON file
+
+        :param path: output file
+        """
+
+        with open(path, "w") as file:
+            json.dump(self.stats(), file, indent=2)
+
+
+##
+# NullProfiler class
+#  a profiler that times nothing (profiling off)
+class NullProfiler:
+    enabled = False
+
+    def setFrameRate(self, framesPerSecond):
+        pass
+
+    def start(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def end(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
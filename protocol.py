@@ -0,0 +1,70 @@
+##
+# Table protocol
+#  Line-delimited ASCII requests and replies between server.py and client.py.
+#
+#  Requests:  NEW [bank] [minWage] [seed]
+#             START|DEAL|DEALALL|CHECK|FOLD|REBET|STATE|CLOSE <table>
+#             RAISE <table> <wage>
+#             QUIT
+#  Replies:   OK|NO <table> <state> <bank> <pot> <minWage> <win> <shownDown> <board> <player> <AI>
+#             (NO: the action was not allowed in this state; cards are comma
+#             separated codes or "-", AI cards are "?" until the showdown)
+#             BYE | ERR <message>
+
+ACTIONS = ("START", "DEAL", "DEALALL", "CHECK", "FOLD", "REBET", "STATE", "CLOSE", "RAISE")
+
+
+def _cards(codes, hidden=False):
+    """
+    Encode a list of card codes
+
+    :param codes: list of card codes
+    :param hidden: send "?" instead of the codes
+    :return: string
+    """
+
+    if not codes:
+        return "-"
+    if hidden:
+        return ",".join("?" for code in codes)
+    return ",".join(str(code) for code in codes)
+
+
+def encodeState(ok, table, engine):
+    """
+    Encode a table's state as a reply line
+
+    :param ok: True if the request was carried out
+    :param table: table id
+    :param engine: PokerEngine of the table
+    :return: bytes - reply line
+    """
+
+    fields = ("OK" if ok else "NO", table, engine.state(), engine.bank(), engine.pot(), engine.minWage(),
+              engine.win(), int(engine.shownDown()), _cards(engine.communityCards()),
+              _cards(engine.playerCards()), _cards(engine.AICards(), not engine.shownDown()))
+    return (" ".join(str(field) for field in fields) + "\n").encode()
+
+
+def decodeState(line):
+    """
+    Decode a reply line
+
+    :param line: reply line (bytes or string)
+    :return: dictionary of the reply fields (hidden cards are None)
+    """
+
+    if isinstance(line, bytes):
+        line = line.decode()
+    parts = line.split()
+    if not parts or parts[0] not in ("OK", "NO") or len(parts) != 11:
+        raise ValueError("bad reply: " + line.strip())
+
+    def cards(field):
+        if field == "-":
+            return []
+        return [None if code == "?" else int(code) for code in field.split(",")]
+
+    return {"ok": parts[0] == "OK", "table": int(parts[1]), "state": int(parts[2]), "bank": int(parts[3]),
+            "pot": int(parts[4]), "minWage": int(parts[5]), "win": int(parts[6]), "shownDown": parts[7] == "1",
+            "communityCards": cards(parts[8]), "playerCards": cards(parts[9]), "AICards": cards(parts[10])}
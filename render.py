@@ -0,0 +1,115 @@
+import pygame
+from profiler import NULL_PROFILER
+
+
+##
+# DirtyRenderer class
+#  redraws only the parts of the window that changed since the last frame
+#
+#  Every frame the caller lists what should be on screen, in drawing order, as
+#  (key, token, rect, draw) items: key identifies the item across frames,
+#  token changes whenever its look changes (e.g. the rendered text surface),
+#  rect is the area it paints and draw paints it.  Areas of items that were
+#  added, removed, moved or changed are restored from a cached background,
+#  the items overlapping them are redrawn clipped to those areas, and only
+#  those areas are pushed to the screen.
+#
+#  Items come in layers, e.g. texts and sprites.  The dirty areas do not
+#  overlap, so every layer can be drawn in all of them before the next one
+#  and each layer is timed on its own by a profiler (see profiler.py).
+class DirtyRenderer:
+    def __init__(self, display, color):
+        """
+        Set up the renderer and its cached background
+
+        :param display: pygame window
+        :param color: background color
+        """
+
+        self._display = display
+        self._screen = display.get_rect()
+        self._background = pygame.Surface(self._screen.size).convert()
+        self._background.fill(color)
+        self._last = {}
+        self._full = True
+
+    def invalidate(self):
+        """
+        Redraw the whole window on the next frame
+        """
+
+        self._full = True
+
+    def render(self, layers, profiler=NULL_PROFILER):
+        """
+        Draw the changed parts of a frame and push them to the screen
+
+        :param layers: list of (name, items) in drawing order, items being
+                       lists of (key, token, rect, draw) in drawing order
+        :param profiler: profiler.FrameProfiler timing the "dirty" phase,
+                         every layer by name and the "display" phase
+        :return: list of rects pushed to the screen
+        """
+
+        # Compare with the last frame
+        current = {}
+        dirty = []
+        for key, token, rect, draw in (item for name, items in layers for item in items):
+            rect = pygame.Rect(rect)
+            current[key] = (token, rect)
+            old = self._last.get(key)
+            if old is None:
+                dirty.append(rect)
+            elif old[0] != token or old[1] != rect:
+                dirty.append(rect)
+                dirty.append(old[1])
+        for key, (token, rect) in self._last.items():
+            if key not in current:
+                dirty.append(rect)
+        self._last = current
+
+        if self._full:
+            self._full = False
+            dirty = [self._screen]
+        dirty = self._merge(dirty)
+        if not dirty:
+            profiler.lap("dirty")
+            return dirty
+
+        # Restore the background, then redraw every layer where it overlaps a dirty area
+        for area in dirty:
+            self._display.blit(self._background, area, area)
+        profiler.lap("dirty")
+        for name, items in layers:
+            for area in dirty:
+                self._display.set_clip(area)
+                for key, token, rect, draw in items:
+                    if area.colliderect(current[key][1]):
+                        draw()
+            profiler.lap(name)
+        self._display.set_clip(None)
+
+        pygame.display.update(dirty)
+        profiler.lap("display")
+        return dirty
+
+    def _merge(self, rects):
+        """
+        Clip rects to the window and merge the ones that overlap
+
+        :param rects: list of rects
+        :return: list of disjoint rects
+        """
+
+        merged = []
+        for rect in rects:
+            rect = rect.clip(self._screen)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            # Grow the rect until it overlaps none of the merged ones
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
@@ -0,0 +1,179 @@
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core import cardName
+from engine import LOST, WON, DRAW
+from history import FILE_HEADER, RECORD, NO_CARD, HistoryReader, indexPath
+
+##
+# History replay
+#  Re-scores every showdown of a hand history with the current evaluator and
+#  lists the hands whose winner changed, e.g. after changing an evaluator or
+#  a tie-break rule.  The history and its index are memory mapped and read
+#  in chunks of hand records, so memory stays the same whatever the size of
+#  the file; each chunk is scored with one batch evaluator call.  The hands
+#  are split into contiguous shards spread across all cores, and every shard
+#  writes its part of the report, which is joined in hand order at the end.
+#
+#  python replay.py history.dat --report changes.csv --backend batch
+
+BACKENDS = ("batch", "bitmask", "table")
+CHUNK_SIZE = 1 << 16  # hand records per chunk
+SHARDS_PER_WORKER = 4
+
+RESULT_NAMES = {LOST: "lost", WON: "won", DRAW: "draw"}
+
+# Byte columns of a history.RECORD
+BOARD = slice(1, 6)
+PLAYER = slice(6, 8)
+AI = slice(8, 10)
+RESULT = 10
+
+
+def _evaluator(backend):
+    """
+    Get a function scoring a 2-D array of hands
+
+    :param backend: "batch", "bitmask" or "table" (see evaluator.setBackend)
+    :return: function of an (N, 7) uint8 array to (N,) uint32 strength keys
+    """
+
+    import numpy as np
+
+    if backend == "batch":
+        from batch import evaluateBatch
+        return evaluateBatch
+
+    # The backend's function itself, so handStrength keeps its backend in this process
+    if backend == "table":
+        import lookup
+        evaluate = lookup.load().evaluate
+    elif backend == "bitmask":
+        from evaluator import evaluate
+    else:
+        raise ValueError("unknown evaluator backend: " + str(backend))
+    return lambda codes: np.fromiter((evaluate(hand) for hand in codes.tolist()), np.uint32, len(codes))
+
+
+def _cardNames(codes):
+    """
+    Name cards for the report
+
+    :param codes: iterable of card codes
+    :return: string - names separated by spaces
+    """
+
+    return " ".join(cardName(code) for code in codes)
+
+
+def _shard(path, start, stop, backend, reportPath, chunkSize=CHUNK_SIZE):
+    """
+    Re-score the showdowns of a range of hands
+
+    :param path: history file
+    :param start: index of the first hand
+    :param stop: index after the last hand
+    :param backend: evaluator to score with
+    :param reportPath: file to write the changed hands to
+    :param chunkSize: hand records read at a time
+    :return: (showdowns, changed)
+    """
+
+    import numpy as np
+
+    evaluate = _evaluator(backend)
+    data = np.memmap(path, np.uint8, "r")
+    count = (len(data) - FILE_HEADER.size) // RECORD.size
+    records = data[FILE_HEADER.size:FILE_HEADER.size + count * RECORD.size].reshape(count, RECORD.size)
+    offsets = np.memmap(indexPath(path), "<u8", "r")
+
+    showdowns = 0
+    changed = 0
+    with open(reportPath, "w") as report:
+        for first in range(start, stop, chunkSize):
+            last = min(first + chunkSize, stop)
+            rows = records[(offsets[first:last] - FILE_HEADER.size) // RECORD.size]
+
+            # Only showdowns have both hands and the whole board
+            hands = np.flatnonzero((rows[:, RESULT] & 4 != 0) & (rows[:, BOARD.stop - 1] != NO_CARD))
+            rows = rows[hands]
+            codes = np.empty((len(rows), 2, 7), np.uint8)
+            codes[:, 0, :2] = rows[:, PLAYER]
+            codes[:, 1, :2] = rows[:, AI]
+            codes[:, :, 2:] = rows[:, None, BOARD]
+            keys = evaluate(codes.reshape(-1, 7)).reshape(-1, 2)
+
+            replayed = np.where(keys[:, 0] > keys[:, 1], WON, np.where(keys[:, 0] == keys[:, 1], DRAW, LOST))
+            recorded = rows[:, RESULT] & 3
+            showdowns += len(rows)
+            for i in np.flatnonzero(replayed != recorded).tolist():
+                report.write("{},{},{},{},{},{}\n".format(
+                    first + hands[i], _cardNames(rows[i, BOARD]), _cardNames(rows[i, PLAYER]),
+                    _cardNames(rows[i, AI]), RESULT_NAMES[recorded[i]], RESULT_NAMES[replayed[i]]))
+                changed += 1
+
+    del records, data, offsets
+    return showdowns, changed
+
+
+def replay(path, reportPath, backend="batch", workers=None, chunkSize=CHUNK_SIZE):
+    """
+    Re-score every showdown of a history and write the hands whose winner changed
+
+    :param path: history file
+    :param reportPath: CSV report to write (hand, board, player, AI, recorded, replayed)
+    :param backend: "batch" (numpy) or an evaluator.setBackend name
+    :param workers: worker processes (all cores by default)
+    :param chunkSize: hand records read at a time by every worker
+    :return: (hands, showdowns, changed)
+    """
+
+    with HistoryReader(path) as reader:
+        hands = len(reader)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Contiguous shards, so the report parts join in hand order
+    shardCount = min(workers * SHARDS_PER_WORKER, -(-hands // chunkSize))
+    bounds = [hands * i // max(shardCount, 1) for i in range(shardCount + 1)]
+    parts = [reportPath + ".part" + str(i) for i in range(shardCount)]
+    jobs = [(path, bounds[i], bounds[i + 1], backend, parts[i], chunkSize) for i in range(shardCount)]
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_shard, *zip(*jobs)))
+
+    with open(reportPath, "w") as report:
+        report.write("hand,board,player,AI,recorded,replayed\n")
+        for part in parts:
+            with open(part) as file:
+                shutil.copyfileobj(file, report)
+            os.remove(part)
+    return hands, sum(result[0] for result in results), sum(result[1] for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score the showdowns of a hand history")
+    parser.add_argument("history")
+    parser.add_argument("--report", default="replay.csv")
+    parser.add_argument("--backend", default="batch", choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="hand records read at a time")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    hands, showdowns, changed = replay(args.history, args.report, args.backend, args.workers, args.chunk)
+    elapsed = time.perf_counter() - start
+    print("{:,} hands, {:,} showdowns, {:,} changed in {:.1f} s ({:,.0f} hands/s)".format(
+        hands, showdowns, changed, elapsed, hands / elapsed if elapsed else 0))
+    print("Report:", args.report)
+    if changed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import random
+import secrets
+
+##
+# Random streams
+#  Every table, deck and simulation batch draws from its own generator, so
+#  nothing shares the global random state and any deal can be replayed from
+#  its seed.  A stream is named by a seed and a path of labels:
+#
+#    stream(seed, "deck")       the deck of a table
+#    stream(seed, batch)        one Monte Carlo batch
+#
+#  Streams with different paths are independent.  To split a run across N
+#  workers, give worker i the seed split(seed, N)[i] (which is streamSeed(seed,
+#  i)); a worker splits its seed again the same way, so the streams of a run
+#  depend only on the run seed and the path, never on the number of workers
+#  or on which process draws them.
+
+DEAL_CARDS = 9  # 5 community cards, 2 player cards, 2 AI cards
+DEAL_CHUNK = 1 << 16  # deals generated at a time by dealBulk
+
+
+def newSeed():
+    """
+    Get a fresh seed from the operating system
+
+    :return: int - 64-bit seed
+    """
+
+    return secrets.randbits(64)
+
+
+def streamSeed(seed, *path):
+    """
+    Get the seed of a stream
+
+    :param seed: seed of the run (int or string)
+    :param path: labels naming the stream (ints or strings)
+    :return: string seed, usable as a seed itself
+    """
+
+    return ":".join(str(part) for part in (seed,) + path)
+
+
+def split(seed, count):
+    """
+    Get independent seeds for workers
+
+    :param seed: seed of the run
+    :param count: number of workers
+    :return: list of seeds, one per worker
+    """
+
+    return [streamSeed(seed, i) for i in range(count)]
+
+
+def stream(seed=None, *path):
+    """
+    Get a random generator for a stream
+
+    :param seed: seed of the run (a fresh seed when None)
+    :param path: labels naming the stream
+    :return: random.Random
+    """
+
+    if seed is None:
+        seed = newSeed()
+    # random.Random hashes string seeds with SHA-512
+    return random.Random(streamSeed(seed, *path))
+
+
+def numpyStream(seed=None, *path):
+    """
+    Get a numpy random generator for a stream
+
+    :param seed: seed of the run (a fresh seed when None)
+    :param path: labels naming the stream
+    :return: numpy.random.Generator
+    """
+
+    import numpy as np
+
+    if seed is None:
+        seed = newSeed()
+    digest = hashlib.sha512(streamSeed(seed, *path).encode()).digest()
+    return np.random.default_rng(int.from_bytes(digest[:32], "little"))
+
+
+def dealBulk(count, seed=None, cards=DEAL_CARDS, chunkSize=DEAL_CHUNK):
+    """
+    Deal many hands at once: every row is the first cards of an independent
+    shuffle, made with a partial Fisher-Yates shuffle of all rows at a time
+
+    :param count: number of deals
+    :param seed: seed of the run (a fresh seed when None); chunk i uses numpyStream(seed, "deal", i)
+    :param cards: cards per deal (9: board 0-4, player 5-6, AI 7-8)
+    :param chunkSize: deals shuffled at a time, which bounds the memory used
+    :return: (count, cards) uint8 numpy array of card codes; with the same seed
+             and chunk size, fewer deals are the first rows of more deals
+    """
+
+    import numpy as np
+
+    if seed is None:
+        seed = newSeed()
+    out = np.empty((count, cards), np.uint8)
+    rows = np.arange(chunkSize)
+    for chunk, start in enumerate(range(0, count, chunkSize)):
+        # Whole chunks, so the rows do not depend on the count
+        generator = numpyStream(seed, "deal", chunk)
+        decks = np.tile(np.arange(52, dtype=np.uint8), (chunkSize, 1))
+        for position in range(cards):
+            # Swap a random undealt card of every row into the position
+            picks = position + generator.integers(52 - position, size=chunkSize)
+            chosen = decks[rows, picks]
+            decks[rows, picks] = decks[:, position]
+            decks[:, position] = chosen
+        out[start:start + chunkSize] = decks[:count - start, :cards]
+    return out
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import itertools
+from engine import PokerEngine, DEALING
+from protocol import ACTIONS, encodeState
+
+##
+# Multi-table game server
+#  Runs any number of independent PokerEngine tables on one asyncio event
+#  loop and speaks the line protocol of protocol.py over TCP or a Unix
+#  socket.  Every table belongs to the connection that created it and is
+#  dropped when that connection closes.  A connection's requests are handled
+#  in order, and its next line is not read until the reply has drained into
+#  the socket, so a slow reader only ever holds a bounded amount of output.
+#
+#  python server.py --port 7777
+#  python server.py --unix /tmp/poker.sock
+
+MAX_LINE = 256
+MAX_TABLES = 64  # per connection
+WRITE_HIGH_WATER = 64 * 1024
+
+
+##
+# PokerServer class
+#  hosts the tables and handles client connections
+class PokerServer:
+    def __init__(self, maxTables=MAX_TABLES):
+        """
+        Set up a server without tables
+
+        :param maxTables: tables one connection may open
+        """
+
+        self._tables = {}
+        self._ids = itertools.count(1)
+        self._maxTables = maxTables
+
+    def tableCount(self):
+        """
+        Get the number of open tables
+
+        :return: int - number of tables
+        """
+
+        return len(self._tables)
+
+    def request(self, line, owned):
+        """
+        Carry out one request line
+
+        :param line: request line (bytes)
+        :param owned: set of table ids of the connection
+        :return: bytes - reply line, or None to close the connection
+        """
+
+        parts = line.decode("ascii", "replace").split()
+        if not parts:
+            return b"ERR empty request\n"
+        command = parts[0].upper()
+
+        if command == "QUIT":
+            return None
+
+        if command == "NEW":
+            if len(owned) >= self._maxTables:
+                return b"ERR too many tables\n"
+            try:
+                options = [int(part) for part in parts[1:3]]
+            except ValueError:
+                return b"ERR bad number\n"
+            # An optional seed makes the table's deals replayable
+            seed = parts[3] if len(parts) > 3 else None
+            table = next(self._ids)
+            self._tables[table] = PokerEngine(*options, seed=seed)
+            owned.add(table)
+            return encodeState(True, table, self._tables[table])
+
+        if command not in ACTIONS:
+            return b"ERR unknown command\n"
+        try:
+            table = int(parts[1])
+        except (IndexError, ValueError):
+            return b"ERR missing table\n"
+        if table not in owned:
+            return b"ERR no such table\n"
+        engine = self._tables[table]
+
+        if command == "START":
+            ok = engine.start()
+        elif command == "DEAL":
+            ok = engine.dealNext() is not None
+        elif command == "DEALALL":
+            ok = engine.state() == DEALING
+            engine.deal()
+        elif command == "CHECK":
+            ok = engine.check()
+        elif command == "RAISE":
+            try:
+                ok = engine.raiseBet(int(parts[2]))
+            except (IndexError, ValueError):
+                return b"ERR missing wage\n"
+        elif command == "FOLD":
+            ok = engine.fold()
+        elif command == "REBET":
+            ok = engine.rebet()
+        elif command == "CLOSE":
+            reply = encodeState(True, table, engine)
+            self.closeTable(table, owned)
+            return reply
+        else:
+            ok = True
+        return encodeState(ok, table, engine)
+
+    def closeTable(self, table, owned):
+        """
+        Drop a table
+
+        :param table: table id
+        :param owned: set of table ids of the connection
+        """
+
+        owned.discard(table)
+        self._tables.pop(table, None)
+
+    async def handle(self, reader, writer):
+        """
+        Serve one connection until it quits or disconnects
+
+        :param reader: asyncio StreamReader
+        :param writer: asyncio StreamWriter
+        """
+
+        writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+        owned = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b"ERR line too long\n")
+                    break
+                if not line:
+                    break
+                reply = self.request(line, owned)
+                if reply is None:
+                    writer.write(b"BYE\n")
+                    break
+                writer.write(reply)
+                # Backpressure: wait while the client is not reading
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for table in list(owned):
+                self.closeTable(table, owned)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host="127.0.0.1", port=7777, unix=None):
+        """
+        Accept connections forever
+
+        :param host: TCP host
+        :param port: TCP port
+        :param unix: Unix socket path (used instead of TCP when given)
+        """
+
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host poker tables")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(PokerServer().serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+from evaluator import addCards, finish, cardCode, handStrength, EMPTY_STATE
+
+##
+# Showdown
+#  Ranks every seat of a table on the shared board.  The board's rank and
+#  suit masks are built once; each seat only adds its two hole cards to them
+#  before its strength key is read, so N seats cost one board plus N small
+#  steps instead of N full evaluations.  The result holds the order of the
+#  seats and the groups of seats that tie, which split a pot.
+#
+#  Hands compare by their strength key (handKey): one integer per hand,
+#  kickers included, so a list of hands sorts with key=handKey.  rankHands
+#  ranks thousands of hands in one call (a tournament table, a simulation):
+#  the keys come from the numpy batch evaluator and are sorted and grouped
+#  with numpy, so no hand is ever compared with another in Python.
+
+MAX_SEATS = 9
+
+
+##
+# Showdown class
+#  the ranking of the seats of one showdown
+class Showdown:
+    def __init__(self, keys, order=None, groups=None):
+        """
+        Rank seats by strength key
+
+        :param keys: strength key per seat (None for a seat out of the hand)
+        :param order: seats best first, when already sorted (see rankHands)
+        :param groups: tie groups of the order, when already grouped
+        """
+
+        self.keys = keys
+        if order is None:
+            # Stable, so tied seats stay in seat order
+            order = sorted((seat for seat, key in enumerate(keys) if key is not None),
+                           key=lambda seat: keys[seat], reverse=True)
+        self.order = order
+
+        # Seats with equal keys, best group first
+        if groups is None:
+            groups = []
+            for seat in order:
+                if groups and keys[groups[-1][0]] == keys[seat]:
+                    groups[-1].append(seat)
+                else:
+                    groups.append([seat])
+        self.groups = groups
+        self.winners = groups[0] if groups else []
+
+        self._places = [None] * len(keys)
+        for place, group in enumerate(groups):
+            for seat in group:
+                self._places[seat] = place
+
+    def place(self, seat):
+        """
+        Get the place of a seat, counting tied seats as one place
+
+        :param seat: seat number
+        :return: int - 0 for the winners, or None for a seat out of the hand
+        """
+
+        return self._places[seat]
+
+    def split(self, pot):
+        """
+        Split a pot between the winners (odd chips go to the first seats)
+
+        :param pot: chips in the pot
+        :return: dictionary of seat to chips won
+        """
+
+        if not self.winners:
+            return {}
+        share, odd = divmod(pot, len(self.winners))
+        return {seat: share + (1 if i < odd else 0) for i, seat in enumerate(sorted(self.winners))}
+
+    def __repr__(self):
+        return "Showdown(groups=" + str(self.groups) + ")"
+
+
+def showdown(board, holes):
+    """
+    Rank the seats of a table on a shared board
+
+    :param board: community card codes
+    :param holes: hole card codes of every seat (None for a seat that folded)
+    :return: Showdown
+    """
+
+    boardState = addCards(EMPTY_STATE, board)
+    return Showdown([None if hole is None else finish(addCards(boardState, hole)) for hole in holes])
+
+
+def handKey(cards):
+    """
+    Get the sort key of a hand: a better hand always has a bigger key and
+    equal hands (kickers included) have equal keys
+
+    :param cards: 5 ~ 7 cards or card codes
+    :return: int - strength key
+    """
+
+    return handStrength(cards)
+
+
+def compareHands(first, second):
+    """
+    Compare two hands
+
+    :param first: 5 ~ 7 cards or card codes
+    :param second: 5 ~ 7 cards or card codes
+    :return: int - 1 if the first hand wins, -1 if the second wins, 0 for a tie
+    """
+
+    firstKey = handKey(first)
+    secondKey = handKey(second)
+    return (firstKey > secondKey) - (firstKey < secondKey)
+
+
+def rankHands(hands):
+    """
+    Rank many hands at once and group the exact ties
+
+    :param hands: list of hands (cards or card codes), or an (N, cards) array of card codes
+    :return: Showdown over the hand indexes (order best first, ties in input order)
+    """
+
+    try:
+        import numpy as np
+        from batch import evaluateBatch
+    except ImportError:
+        np = None
+
+    if np is not None and not isinstance(hands, np.ndarray) and len(set(map(len, hands))) == 1:
+        hands = np.array([[cardCode(card) for card in hand] for hand in hands], np.uint8)
+    if np is None or not isinstance(hands, np.ndarray):
+        # Hands of different sizes (or no numpy): one key per hand, sorted by key
+        return Showdown([handKey(hand) for hand in hands])
+    if len(hands) == 0:
+        return Showdown([])
+
+    keys = evaluateBatch(hands)
+    # ~key sorts the best hand first; a stable sort keeps ties in input order
+    order = np.argsort(~keys, kind="stable")
+    ranked = keys[order]
+    starts = np.flatnonzero(ranked[1:] != ranked[:-1]) + 1
+    groups = [group.tolist() for group in np.split(order, starts)]
+    return Showdown(keys.tolist(), order.tolist(), groups)
@@ -1,5 +1,44 @@
+import functools
 import pygame
 
+# Fonts shared by every textbox, keyed by (name, size)
+_fonts = {}
+
+
+def getFont(name, size):
+    """
+    Get a system font, looking it up only the first time
+
+    :param name: font name
+    :param size: font size
+    :return: pygame font
+    """
+
+    font = _fonts.get((name, size))
+    if font is None:
+        # Start the font module on first use
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _fonts[(name, size)] = font
+    return font
+
+
+@functools.lru_cache(maxsize=256)
+def renderText(text, font, fontSize, color, backColor=None):
+    """
+    Render text, reusing the surface of recent identical requests
+
+    :param text: text to render
+    :param font: font name
+    :param fontSize: font size
+    :param color: color of the font
+    :param backColor: background color (None for transparent)
+    :return: pygame surface (shared, do not draw on it)
+    """
+
+    return getFont(font, fontSize).render(text, True, color, backColor)
+
 
 ##
 # Text class
@@ -24,8 +63,9 @@ class Text:
         self._color = color
         self._backColor = backColor
         self._display = display
-        self._font = pygame.font.SysFont(font, fontSize)
-        self._text = self._font.render(text, True, color, backColor)
+        self._font = font
+        self._fontSize = fontSize
+        self._text = renderText(text, font, fontSize, color, backColor)
         self._rect = self._text.get_rect()
 
         # Set up position
@@ -50,6 +90,24 @@ class Text:
         """
         return self._rect
 
+    def area(self):
+        """
+        Gets the area painted by draw()
+
+        :return: rect
+        """
+
+        return self._rect
+
+    def appearance(self):
+        """
+        Gets a value that changes whenever the textbox looks different
+
+        :return: the rendered text surface
+        """
+
+        return self._text
+
     def setPos(self):
         """
         update position of the text
@@ -94,7 +152,7 @@ class Text:
         :param text: text for the textbox
         """
 
-        self._text = self._font.render(text, True, self._color, self._backColor)
+        self._text = renderText(text, self._font, self._fontSize, self._color, self._backColor)
         self._rect = self._text.get_rect()
         self.setPos()
 
@@ -127,6 +185,15 @@ class Button(Text):
         BLACK = (0, 0, 0)
         super().__init__(display, text, position, location, fontSize, font, BLACK, GRAY)
 
+    def area(self):
+        """
+        Gets the area painted by draw(), borders included
+
+        :return: rect
+        """
+
+        return self._rect.inflate(8, 8)
+
     def draw(self):
         """
         draw the textbox on pygame window
@@ -167,8 +234,7 @@ class InputBox:
         self._display = display
         self._text = text
         self._rect = pygame.Rect(x, y, w, h)
-        self._font = pygame.font.SysFont("comicsansms", 20)
-        self._surface = self._font.render(self._text, True, BLACK)
+        self._surface = renderText(self._text, "comicsansms", 20, BLACK)
 
         self.INACTIVE_COLOR = (106, 202, 154)
         self.ACTIVE_COLOR = (255, 255, 255)
@@ -198,7 +264,7 @@ class InputBox:
                 if len(self._text) < 5:
                     self._text += event.unicode
 
-            self._surface = self._font.render(self._text, True, (0, 0, 0))
+            self._surface = renderText(self._text, "comicsansms", 20, (0, 0, 0))
 
     def text(self):
         """
@@ -208,6 +274,33 @@ class InputBox:
 
         return self._text
 
+    def active(self):
+        """
+        Checks if the input box takes keyboard inputs
+
+        :return: True or False
+        """
+
+        return self._active
+
+    def area(self):
+        """
+        Gets the area painted by draw()
+
+        :return: rect
+        """
+
+        return self._rect.union(self._surface.get_rect(topleft=self._rect.topleft))
+
+    def appearance(self):
+        """
+        Gets a value that changes whenever the input box looks different
+
+        :return: the rendered text surface and whether the box is active
+        """
+
+        return self._surface, self._active
+
     def draw(self):
         """
         Draws the enclosing rectangle on pygame window along with the text